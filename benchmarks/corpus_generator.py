@@ -0,0 +1,149 @@
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import shutil
+
+# Building blocks for synthetic Ballerina sources. The constructs mirror what
+# `regex_patterns` is meant to extract (functions with modifiers, parameters and
+# return types, services) plus the filler found in real files (imports, types, comments).
+_MODIFIERS = ['', '', 'public ', 'private ', 'isolated ', 'public isolated ', 'remote ', 'transactional ']
+_TYPES = ['int', 'string', 'boolean', 'float', 'decimal', 'json', 'byte[]', 'map<string>', 'error']
+_RETURNS = ['', 'returns int ', 'returns string ', 'returns error? ', 'returns json|error ', 'returns boolean ']
+_WORDS = ['order', 'user', 'payment', 'invoice', 'cart', 'item', 'stock', 'price', 'total', 'status',
+          'request', 'response', 'client', 'record', 'entry', 'value', 'count', 'index', 'name', 'data']
+_STATEMENTS = [
+    'int {v} = {n};',
+    'string {v} = "{w}-{n}";',
+    'io:println("{w}: ", {v});',
+    'if {v} > {n} {{\n        return {v};\n    }}',
+    'foreach int i in 0 ..< {n} {{\n        {v} += i;\n    }}',
+    '// TODO: validate {w} before use',
+    'check caller->respond({v});',
+    'log:printInfo("processing {w}");',
+]
+
+# Size suffixes accepted by `parse_size`
+_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def parse_size(size: str) -> int:
+    """Parse a human readable size such as `1MB` or `10GB` into bytes."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?B)\s*', size.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {size}. Expected a number followed by B, KB, MB or GB.")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def _identifier(rng):
+    return rng.choice(_WORDS) + rng.choice(_WORDS).capitalize() + str(rng.randint(0, 999))
+
+
+def _body(rng):
+    lines = []
+    for _ in range(rng.randint(1, 8)):
+        lines.append('    ' + rng.choice(_STATEMENTS).format(
+            v=rng.choice(_WORDS), w=rng.choice(_WORDS), n=rng.randint(0, 1000)))
+    return '\n'.join(lines)
+
+
+def generate_function(rng):
+    """Generate a single Ballerina function definition."""
+    params = ', '.join(f'{rng.choice(_TYPES)} {rng.choice(_WORDS)}{i}' for i in range(rng.randint(0, 3)))
+    return (f'{rng.choice(_MODIFIERS)}function {_identifier(rng)}({params}) {rng.choice(_RETURNS)}{{\n'
+            f'{_body(rng)}\n}}\n')
+
+
+def generate_service(rng):
+    """Generate a single Ballerina service definition with resource functions."""
+    resources = '\n'.join(
+        f'    resource function get {rng.choice(_WORDS)}() returns string {{\n        return "{rng.choice(_WORDS)}";\n    }}'
+        for _ in range(rng.randint(1, 3)))
+    return f'service {rng.choice(_WORDS)}Service on {rng.choice(_WORDS)}Listener {{\n{resources}\n}}\n'
+
+
+def generate_file(rng, target_bytes):
+    """Generate the contents of a `.bal` file of roughly `target_bytes` bytes."""
+    parts = ['import ballerina/io;\nimport ballerina/log;\n']
+    size = len(parts[0])
+    while size < target_bytes:
+        roll = rng.random()
+        if roll < 0.7:
+            part = generate_function(rng)
+        elif roll < 0.85:
+            part = generate_service(rng)
+        else:
+            part = f'type {_identifier(rng).capitalize()} record {{\n    {rng.choice(_TYPES)} {rng.choice(_WORDS)};\n}};\n'
+        parts.append(part)
+        size += len(part) + 1
+    return '\n'.join(parts)
+
+
+def generate_corpus(output_dir: str, total_bytes: int, file_bytes: int = 64 * 1024, seed: int = 42,
+                    files_per_dir: int = 1000) -> dict:
+    """
+    Generate a deterministic synthetic Ballerina corpus on disk.
+
+    Files are written one at a time so memory use stays flat regardless of corpus size.
+    A corpus already generated with the same parameters is reused, otherwise the old
+    `module_*` directories are removed before generating.
+
+    Args:
+        output_dir (str): Directory to write the `.bal` files into
+        total_bytes (int): Approximate total size of the corpus
+        file_bytes (int): Approximate size of each file
+        seed (int): Random seed
+        files_per_dir (int): Number of files per subdirectory
+
+    Returns:
+        dict: Corpus manifest (parameters, file count and actual size)
+    """
+    params = {"total_bytes": total_bytes, "file_bytes": file_bytes, "seed": seed, "files_per_dir": files_per_dir}
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['params'] == params:
+            return manifest
+        os.remove(manifest_path)
+
+    # Remove any previous (or partially written) corpus so no stale files are left behind
+    for subdir in glob.glob(os.path.join(output_dir, 'module_*')):
+        shutil.rmtree(subdir)
+
+    rng = random.Random(seed)
+    written = 0
+    file_count = 0
+    while written < total_bytes:
+        subdir = os.path.join(output_dir, f'module_{file_count // files_per_dir:05d}')
+        if file_count % files_per_dir == 0:
+            os.makedirs(subdir, exist_ok=True)
+        content = generate_file(rng, min(file_bytes, total_bytes - written))
+        with open(os.path.join(subdir, f'source_{file_count:07d}.bal'), 'w', encoding='utf-8') as f:
+            f.write(content)
+        written += len(content.encode('utf-8'))
+        file_count += 1
+
+    manifest = {"params": params, "file_count": file_count, "size_bytes": written}
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    """Entry point of the script."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic Ballerina corpus.")
+    parser.add_argument('output_dir', help="Directory to write the corpus into")
+    parser.add_argument('--size', default='1MB', help="Total corpus size, e.g. 1MB, 500MB, 10GB")
+    parser.add_argument('--file-size', default='64KB', help="Approximate size of each file")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    manifest = generate_corpus(args.output_dir, parse_size(args.size), parse_size(args.file_size), args.seed)
+    print(f"Corpus: {manifest['file_count']} files, {manifest['size_bytes'] / (1024 ** 2):.2f} MB in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
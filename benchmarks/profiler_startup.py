@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Directory containing `fine_tuning_profiler.py`
+UTILS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+
+# Heavy modules that must not be loaded just by importing the profiler or starting a sampler
+HEAVY_MODULES = ['pandas', 'matplotlib', 'pynvml', 'numpy']
+
+# Executed in a fresh interpreter so that nothing is cached from this process
+_PROBE = r'''
+import json, resource, sys, time
+sys.path.insert(0, {utils_dir!r})
+
+def rss_mb():
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+baseline_rss = rss_mb()
+t0 = time.perf_counter()
+import fine_tuning_profiler
+import_s = time.perf_counter() - t0
+import_rss = rss_mb()
+after_import = [m for m in {heavy!r} if m in sys.modules]
+
+t0 = time.perf_counter()
+monitor = fine_tuning_profiler.ResourceMonitor(interval={interval})
+monitor.start()
+start_s = time.perf_counter() - t0
+time.sleep({sample_s})
+t0 = time.perf_counter()
+monitor.stop()
+stop_s = time.perf_counter() - t0
+after_sampling = [m for m in {heavy!r} if m in sys.modules]
+
+print(json.dumps({{
+    "baseline_rss_MB": baseline_rss,
+    "import_s": import_s,
+    "import_rss_MB": import_rss,
+    "start_s": start_s,
+    "stop_s": stop_s,
+    "sampling_rss_MB": rss_mb(),
+    "samples": len(monitor.resource_log),
+    "heavy_modules_after_import": after_import,
+    "heavy_modules_after_sampling": after_sampling,
+}}))
+'''
+
+
+def run_probe(interval: float, sample_s: float) -> dict:
+    """
+    Import the profiler and run a short sampling session in a fresh interpreter.
+
+    Args:
+        interval (float): Sampling interval passed to ResourceMonitor
+        sample_s (float): How long to keep the sampler running
+
+    Returns:
+        dict: Timings (seconds), RSS (MB) and the heavy modules that got imported
+    """
+    code = _PROBE.format(utils_dir=UTILS_DIR, heavy=HEAVY_MODULES, interval=interval, sample_s=sample_s)
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Entry point of the script."""
+    parser = argparse.ArgumentParser(description="Measure import time and RSS of fine_tuning_profiler.")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of fresh interpreters to measure")
+    parser.add_argument('--interval', type=float, default=0.1, help="Sampler interval in seconds")
+    parser.add_argument('--sample-seconds', type=float, default=0.5, help="How long to run the sampler")
+    parser.add_argument('--output', default=None, help="Optional path to save the results as JSON")
+    args = parser.parse_args()
+
+    runs = [run_probe(args.interval, args.sample_seconds) for _ in range(args.repeat)]
+    # Report the best run for timings, the worst for memory
+    result = {
+        "import_s": min(r["import_s"] for r in runs),
+        "start_s": min(r["start_s"] for r in runs),
+        "import_rss_delta_MB": max(r["import_rss_MB"] - r["baseline_rss_MB"] for r in runs),
+        "sampling_rss_delta_MB": max(r["sampling_rss_MB"] - r["baseline_rss_MB"] for r in runs),
+        "heavy_modules_after_import": sorted({m for r in runs for m in r["heavy_modules_after_import"]}),
+        "heavy_modules_after_sampling": sorted({m for r in runs for m in r["heavy_modules_after_sampling"]}),
+        "runs": runs,
+    }
+
+    print("=== fine_tuning_profiler startup ===")
+    print(f"Import time: {result['import_s'] * 1000:.2f} ms")
+    print(f"Sampler start time: {result['start_s'] * 1000:.2f} ms")
+    print(f"RSS added by import: {result['import_rss_delta_MB']:.2f} MB")
+    print(f"RSS added after sampling: {result['sampling_rss_delta_MB']:.2f} MB")
+    print(f"Heavy modules after import: {result['heavy_modules_after_import'] or 'none'}")
+    print(f"Heavy modules after sampling: {result['heavy_modules_after_sampling'] or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    # Importing the profiler must never pull in pandas/matplotlib/NVML
+    if result['heavy_modules_after_import']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.normpath(os.path.join(BENCHMARKS_DIR, '..'))
+sys.path.insert(0, os.path.join(REPO_DIR, 'data-processing'))
+sys.path.insert(0, os.path.join(REPO_DIR, 'utils'))
+
+from artifact_registry import ArtifactRegistry
+from corpus_generator import generate_corpus, parse_size
+from curate_dataset import DatasetCurator
+from fine_tuning_profiler import ResourceMonitor
+from format_dataset import DatasetFormatter
+import regex_patterns
+
+STAGES = ['read_files', 'extract_code_blocks', 'create_completion_pairs', 'format_chatml', 'resource_monitor_sample']
+
+
+class RssSampler:
+    """Background thread tracking the RSS of this process while each stage is running.
+
+    Besides the absolute peak, every call records its growth over the RSS at entry, so a
+    stage is not charged for memory that earlier stages and batches left allocated.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.current_stage = None
+        self.entry_rss = 0
+        self.peaks = {}
+        self.deltas = {}
+        self._running = False
+        self._thread = None
+
+    def enter(self, stage):
+        """Start attributing samples to a stage call, relative to the current RSS."""
+        self.entry_rss = self.process.memory_info().rss
+        self.current_stage = stage
+
+    def observe(self, stage):
+        """Record the current RSS, and its growth since the call started, for a stage."""
+        rss = self.process.memory_info().rss
+        if rss > self.peaks.get(stage, 0):
+            self.peaks[stage] = rss
+        delta = max(rss - self.entry_rss, 0)
+        if delta > self.deltas.get(stage, 0):
+            self.deltas[stage] = delta
+
+    def _run(self):
+        while self._running:
+            stage = self.current_stage
+            if stage is not None:
+                self.observe(stage)
+            time.sleep(self.interval)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+
+
+class StageStats:
+    """Accumulated time, items, bytes and per-call latencies of a single stage."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.items = 0
+        self.bytes = 0
+        self.latencies = []
+
+    def record(self, seconds, items=0, nbytes=0):
+        self.seconds += seconds
+        self.items += items
+        self.bytes += nbytes
+        self.latencies.append(seconds)
+
+    def to_dict(self, peak_rss, peak_rss_delta):
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+        size_mb = self.bytes / (1024 ** 2)
+        return {
+            "seconds": self.seconds,
+            "calls": len(self.latencies),
+            "items": self.items,
+            "MB": size_mb,
+            "items_per_second": self.items / self.seconds if self.seconds > 0 else 0.0,
+            "MB_per_second": size_mb / self.seconds if self.seconds > 0 else 0.0,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)},
+            "peak_rss_MB": peak_rss / (1024 ** 2),
+            "peak_rss_delta_MB": peak_rss_delta / (1024 ** 2),
+        }
+
+
+def _batches(corpus_dir, batch_bytes):
+    """Yield lists of `.bal` paths totalling roughly `batch_bytes` each, in a stable order."""
+    batch, size = [], 0
+    for root, dirs, files in os.walk(corpus_dir):
+        dirs.sort()
+        for file in sorted(files):
+            if not file.endswith('.bal'):
+                continue
+            path = os.path.join(root, file)
+            batch.append(path)
+            size += os.path.getsize(path)
+            if size >= batch_bytes:
+                yield batch
+                batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def run_benchmarks(corpus_dir, work_dir, batch_bytes, monitor_samples):
+    """
+    Run every stage over the corpus in batches and collect throughput, latency and peak RSS.
+
+    The corpus is processed `batch_bytes` at a time so that multi-GB corpora fit in memory.
+
+    Returns:
+        tuple: Per-stage statistics and the per-pattern statistics of the extraction
+    """
+    stats = {stage: StageStats() for stage in STAGES}
+    sampler = RssSampler()
+    curator = DatasetCurator(registry=ArtifactRegistry(os.path.join(work_dir, 'artifacts.sqlite')))
+    chatml_file = os.path.join(work_dir, 'chat.jsonl')
+
+    def timed(stage, fn, *args):
+        sampler.enter(stage)
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        sampler.current_stage = None
+        # Calls shorter than the sampling interval are still covered by their final RSS
+        sampler.observe(stage)
+        return result, elapsed
+
+    regex_patterns.engine.reset_stats()
+    sampler.start()
+    try:
+        for batch in _batches(corpus_dir, batch_bytes):
+            data, elapsed = timed('read_files', curator.read_files, batch)
+            content = '\n'.join(data)
+            stats['read_files'].record(elapsed, len(batch), len(content.encode('utf-8')))
+            del data
+
+            blocks, elapsed = timed('extract_code_blocks', DatasetFormatter.extract_code_blocks, content)
+            stats['extract_code_blocks'].record(elapsed, len(blocks), len(content.encode('utf-8')))
+            del content
+
+            pairs, elapsed = timed('create_completion_pairs', DatasetFormatter.create_completion_pairs, blocks)
+            stats['create_completion_pairs'].record(elapsed, len(pairs), sum(len(b) for b in blocks))
+            del blocks
+
+            _, elapsed = timed('format_chatml', DatasetFormatter.format_chatml, pairs, chatml_file)
+            stats['format_chatml'].record(elapsed, len(pairs), os.path.getsize(chatml_file))
+            del pairs
+
+        monitor = ResourceMonitor(interval=0)
+        with monitor.gpu_session() as gpu_available:
+            for _ in range(monitor_samples):
+                _, elapsed = timed('resource_monitor_sample', monitor.sample, gpu_available)
+                stats['resource_monitor_sample'].record(elapsed, 1)
+    finally:
+        sampler.stop()
+
+    stages = {stage: stats[stage].to_dict(sampler.peaks.get(stage, 0), sampler.deltas.get(stage, 0)) for stage in STAGES}
+    return stages, regex_patterns.engine.get_stats()
+
+
+def compare_with_baseline(results, baseline, threshold, min_rss_mb=1.0):
+    """
+    Compare results against a baseline.
+
+    A stage regresses if its throughput drops, or the RSS growth during its calls increases,
+    by more than `threshold`. RSS growth changes smaller than `min_rss_mb` are ignored as noise.
+
+    Returns:
+        list: Human readable descriptions of the regressions
+    """
+    regressions = []
+    if baseline['meta']['corpus_bytes'] != results['meta']['corpus_bytes']:
+        print(f"Warning: baseline corpus size {baseline['meta']['corpus_bytes']} differs "
+              f"from current {results['meta']['corpus_bytes']}")
+
+    print(f"\n=== Comparison with baseline (threshold {threshold:.0%}) ===")
+    for stage, current in results['stages'].items():
+        previous = baseline['stages'].get(stage)
+        if previous is None:
+            print(f"{stage:<26}no baseline")
+            continue
+
+        # Stages that move bytes are compared on MB/s, the sampler on samples/s
+        metric = 'MB_per_second' if previous['MB'] > 0 else 'items_per_second'
+        checks = [
+            (metric, current[metric], previous[metric], current[metric] < previous[metric] * (1 - threshold)),
+        ]
+        if 'peak_rss_delta_MB' in previous:
+            now, before = current['peak_rss_delta_MB'], previous['peak_rss_delta_MB']
+            checks.append(('peak_rss_delta_MB', now, before, now > before * (1 + threshold) and now - before > min_rss_mb))
+        else:
+            print(f"{stage:<26}{'peak_rss_delta_MB':<18}no baseline")
+        for name, now, before, regressed in checks:
+            change = (now - before) / before if before else 0.0
+            status = 'REGRESSION' if regressed else 'ok'
+            print(f"{stage:<26}{name:<18}{before:>12.2f} -> {now:>12.2f} ({change:+.1%}) {status}")
+            if regressed:
+                regressions.append(f"{stage}.{name}: {before:.2f} -> {now:.2f} ({change:+.1%})")
+    return regressions
+
+
+def print_results(results):
+    """Print the per-stage results as a table."""
+    print("\n=== Benchmark Results ===")
+    print(f"{'stage':<26}{'seconds':>10}{'items/s':>14}{'MB/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'peak RSS MB':>13}{'RSS +MB':>10}")
+    for stage, s in results['stages'].items():
+        print(f"{stage:<26}{s['seconds']:>10.3f}{s['items_per_second']:>14.1f}{s['MB_per_second']:>10.2f}"
+              f"{s['latency_ms']['p50']:>10.3f}{s['latency_ms']['p95']:>10.3f}{s['peak_rss_MB']:>13.1f}"
+              f"{s['peak_rss_delta_MB']:>10.1f}")
+
+    print(f"\n=== Pattern statistics ({results['patterns']['candidates']} prefilter candidates) ===")
+    for name, s in results['patterns']['families'].items():
+        print(f"{name:<26}{s['hits']:>10} hits{s['attempts']:>12} attempts{s['seconds']:>10.3f}s")
+
+
+def main():
+    """Entry point of the script."""
+    parser = argparse.ArgumentParser(description="Benchmark the data-processing and profiling code paths.")
+    parser.add_argument('--size', default='1MB', help="Synthetic corpus size, from 1MB up to 10GB")
+    parser.add_argument('--corpus-dir', default=None, help="Where to generate (or reuse) the corpus")
+    parser.add_argument('--batch-size', default='64MB', help="Amount of source read per batch")
+    parser.add_argument('--monitor-samples', type=int, default=200, help="Number of ResourceMonitor samples to time")
+    parser.add_argument('--seed', type=int, default=42, help="Corpus random seed")
+    parser.add_argument('--output', default=None, help="Path to save the results JSON")
+    parser.add_argument('--baseline', default=None, help="Baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed relative regression, e.g. 0.1 for 10%%")
+    parser.add_argument('--save-baseline', action='store_true', help="Also write the results to --baseline")
+    args = parser.parse_args()
+
+    corpus_bytes = parse_size(args.size)
+    corpus_dir = args.corpus_dir or os.path.join(tempfile.gettempdir(), 'code-ft-bench', f'corpus_{args.size}_{args.seed}')
+    print(f"=== Generating corpus ({args.size}) in {corpus_dir} ===")
+    manifest = generate_corpus(corpus_dir, corpus_bytes, seed=args.seed)
+    print(f"Corpus: {manifest['file_count']} files, {manifest['size_bytes'] / (1024 ** 2):.2f} MB")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        stages, patterns = run_benchmarks(corpus_dir, work_dir, parse_size(args.batch_size), args.monitor_samples)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "requested_bytes": corpus_bytes,
+            "corpus_bytes": manifest['size_bytes'],
+            "corpus_files": manifest['file_count'],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "stages": stages,
+        "patterns": patterns,
+    }
+    print_results(results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions found:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
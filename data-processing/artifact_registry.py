@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ArtifactRegistry:
+    """SQLite-backed registry of the files produced by the data-processing stages.
+
+    Every artifact is recorded with its content hash, size, row count, configuration and
+    parent artifacts. The most recent artifact per stage and per tag is kept in a keyed
+    `latest` table, so lookups never scan the output directories.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS artifacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL UNIQUE,
+            stage TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            row_count INTEGER,
+            config TEXT NOT NULL,
+            config_hash TEXT NOT NULL,
+            input_hash TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_artifacts_cache ON artifacts (stage, input_hash, config_hash);
+        CREATE TABLE IF NOT EXISTS artifact_parents (
+            artifact_id INTEGER NOT NULL REFERENCES artifacts (id) ON DELETE CASCADE,
+            parent_id INTEGER NOT NULL REFERENCES artifacts (id) ON DELETE CASCADE,
+            PRIMARY KEY (artifact_id, parent_id)
+        );
+        CREATE TABLE IF NOT EXISTS artifact_tags (
+            artifact_id INTEGER NOT NULL REFERENCES artifacts (id) ON DELETE CASCADE,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (artifact_id, tag)
+        );
+        CREATE TABLE IF NOT EXISTS latest (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            artifact_id INTEGER NOT NULL REFERENCES artifacts (id) ON DELETE CASCADE,
+            PRIMARY KEY (kind, key)
+        );
+    """
+
+    def __init__(self, db_path=None):
+        """
+        Open (and create if needed) the registry database.
+
+        Args:
+            db_path (str): Path to the SQLite file. Defaults to `data/artifacts.sqlite` in the repo.
+        """
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.db_path = db_path or os.path.normpath(os.path.join(script_dir, '..', 'data', 'artifacts.sqlite'))
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        # Stages may register from worker threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def hash_file(path, chunk_size=1024 * 1024):
+        """Compute the SHA-256 of a file, reading it in chunks."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_config(config):
+        """Compute a stable hash of a JSON-serializable configuration."""
+        payload = json.dumps(config or {}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_inputs(input_hashes):
+        """Combine the content hashes of a stage's inputs into a single order-independent hash."""
+        return hashlib.sha256('\n'.join(sorted(input_hashes)).encode('utf-8')).hexdigest()
+
+    def _row_to_artifact(self, row):
+        """Convert an `artifacts` row into a dict with its tags and parent ids."""
+        if row is None:
+            return None
+        artifact = dict(row)
+        artifact['config'] = json.loads(artifact['config'])
+        artifact['tags'] = [r['tag'] for r in self._conn.execute(
+            "SELECT tag FROM artifact_tags WHERE artifact_id = ? ORDER BY tag", (artifact['id'],))]
+        artifact['parents'] = [r['parent_id'] for r in self._conn.execute(
+            "SELECT parent_id FROM artifact_parents WHERE artifact_id = ? ORDER BY parent_id", (artifact['id'],))]
+        return artifact
+
+    def _is_current(self, row):
+        """Check that a registered file still has the content it was registered with."""
+        try:
+            stat = os.stat(row['path'])
+        except FileNotFoundError:
+            return False
+        if stat.st_size != row['size_bytes']:
+            return False
+        if stat.st_mtime_ns == row['mtime_ns']:
+            return True
+        # Touched but possibly unchanged: fall back to the content hash
+        if self.hash_file(row['path']) != row['sha256']:
+            return False
+        self._conn.execute("UPDATE artifacts SET mtime_ns = ? WHERE id = ?", (stat.st_mtime_ns, row['id']))
+        self._conn.commit()
+        return True
+
+    def is_current(self, artifact):
+        """
+        Check that an artifact's file still exists with the content it was registered with.
+
+        Size and modification time are compared first; if only the modification time differs,
+        the file is re-hashed.
+        """
+        with self._lock:
+            return self._is_current(artifact)
+
+    def register(self, path, stage, tags=(), parents=(), config=None, row_count=None, input_hash=None):
+        """
+        Record a file produced by a stage. Re-registering a path replaces its previous record.
+
+        Args:
+            path (str): Path to the produced file
+            stage (str): Name of the stage that produced it (e.g. 'curate', 'blocks', 'chatml')
+            tags (iterable): Extra lookup keys (e.g. 'dataset', 'train')
+            parents (iterable): Ids of the artifacts this file was derived from
+            config (dict): Stage configuration used to produce the file
+            row_count (int): Number of records in the file, if known
+            input_hash (str): Hash identifying the stage inputs. Defaults to the combined hash of the parents,
+                              or to the file's own hash for a source file without parents.
+
+        Returns:
+            dict: The registered artifact
+        """
+        path = os.path.abspath(path)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Artifact {path} does not exist.")
+
+        sha256 = self.hash_file(path)
+        stat = os.stat(path)
+        parents = list(parents)
+        config = config or {}
+
+        with self._lock, self._conn:
+            if input_hash is None and not parents:
+                input_hash = sha256
+            elif input_hash is None:
+                parent_hashes = [self._conn.execute("SELECT sha256 FROM artifacts WHERE id = ?", (pid,)).fetchone()
+                                 for pid in parents]
+                if any(h is None for h in parent_hashes):
+                    raise ValueError(f"Unknown parent artifact in {parents}.")
+                input_hash = self.hash_inputs(h['sha256'] for h in parent_hashes)
+
+            self._conn.execute("DELETE FROM artifacts WHERE path = ?", (path,))
+            cursor = self._conn.execute(
+                """INSERT INTO artifacts (path, stage, sha256, size_bytes, mtime_ns, row_count, config, config_hash,
+                                           input_hash, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (path, stage, sha256, stat.st_size, stat.st_mtime_ns, row_count,
+                 json.dumps(config, sort_keys=True, default=str), self.hash_config(config), input_hash, time.time()))
+            artifact_id = cursor.lastrowid
+
+            self._conn.executemany("INSERT OR IGNORE INTO artifact_parents (artifact_id, parent_id) VALUES (?, ?)",
+                                   [(artifact_id, pid) for pid in parents])
+            self._conn.executemany("INSERT OR IGNORE INTO artifact_tags (artifact_id, tag) VALUES (?, ?)",
+                                   [(artifact_id, tag) for tag in tags])
+            self._conn.executemany("INSERT OR REPLACE INTO latest (kind, key, artifact_id) VALUES (?, ?, ?)",
+                                   [('stage', stage, artifact_id)] + [('tag', tag, artifact_id) for tag in tags])
+
+            return self._row_to_artifact(
+                self._conn.execute("SELECT * FROM artifacts WHERE id = ?", (artifact_id,)).fetchone())
+
+    def get(self, artifact_id):
+        """Get an artifact by id, or None if it is not registered."""
+        with self._lock:
+            return self._row_to_artifact(
+                self._conn.execute("SELECT * FROM artifacts WHERE id = ?", (artifact_id,)).fetchone())
+
+    def get_by_path(self, path):
+        """Get the artifact registered for a path, or None if it is not registered."""
+        with self._lock:
+            return self._row_to_artifact(
+                self._conn.execute("SELECT * FROM artifacts WHERE path = ?", (os.path.abspath(path),)).fetchone())
+
+    def latest(self, stage=None, tag=None):
+        """
+        Get the most recently registered artifact for a stage or a tag.
+
+        Args:
+            stage (str): Stage name to look up
+            tag (str): Tag to look up (used if stage is not given)
+
+        Returns:
+            dict: The artifact, or None if nothing was registered for the key
+        """
+        if (stage is None) == (tag is None):
+            raise ValueError("Exactly one of stage or tag must be given.")
+        kind, key = ('stage', stage) if stage is not None else ('tag', tag)
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT a.* FROM latest l JOIN artifacts a ON a.id = l.artifact_id
+                   WHERE l.kind = ? AND l.key = ?""", (kind, key)).fetchone()
+            return self._row_to_artifact(row)
+
+    def latest_path(self, stage=None, tag=None):
+        """Get the path of the most recent artifact for a stage or tag, or None if it is missing on disk."""
+        artifact = self.latest(stage=stage, tag=tag)
+        if artifact is None or not os.path.isfile(artifact['path']):
+            return None
+        return artifact['path']
+
+    def find_cached(self, stage, parents=(), config=None, input_hash=None):
+        """
+        Find an artifact produced by `stage` from the same inputs and configuration.
+
+        The file must still exist on disk with the registered content (see `is_current`), otherwise it is not reused.
+
+        Args:
+            stage (str): Stage name
+            parents (iterable): Ids of the input artifacts
+            config (dict): Stage configuration
+            input_hash (str): Hash identifying the inputs. Defaults to the combined hash of the parents.
+
+        Returns:
+            dict: The most recent matching artifact, or None
+        """
+        parents = list(parents)
+        with self._lock:
+            if input_hash is None:
+                parent_rows = [self._conn.execute("SELECT sha256 FROM artifacts WHERE id = ?", (pid,)).fetchone()
+                               for pid in parents]
+                if any(r is None for r in parent_rows):
+                    return None
+                input_hash = self.hash_inputs(r['sha256'] for r in parent_rows)
+
+            rows = self._conn.execute(
+                """SELECT * FROM artifacts WHERE stage = ? AND input_hash = ? AND config_hash = ?
+                   ORDER BY created_at DESC""",
+                (stage, input_hash, self.hash_config(config))).fetchall()
+            for row in rows:
+                if self._is_current(row):
+                    return self._row_to_artifact(row)
+        return None
+
+    def children(self, artifact_id):
+        """Get the artifacts derived directly from the given artifact."""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT a.* FROM artifact_parents p JOIN artifacts a ON a.id = p.artifact_id
+                   WHERE p.parent_id = ? ORDER BY a.created_at""", (artifact_id,)).fetchall()
+            return [self._row_to_artifact(row) for row in rows]
@@ -4,15 +4,17 @@ import random
 import numpy as np
 from sklearn.model_selection import train_test_split
 
+from artifact_registry import ArtifactRegistry
+
 
 class DatasetCurator:
     """Class to handle the curation of **raw** dataset files from `bal` files in `data-bal-files` directory."""
 
-    def __init__(self):
+    def __init__(self, source_dir=None, output_dir=None, registry=None):
         """Initialize paths, filenames, and configuration."""
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
-        self.repo_dir = os.path.normpath(os.path.join(self.script_dir, '..', 'data-bal-files'))
-        self.output_dir = os.path.normpath(os.path.join(self.script_dir, '..', 'data', 'raw'))
+        self.repo_dir = source_dir or os.path.normpath(os.path.join(self.script_dir, '..', 'data-bal-files'))
+        self.output_dir = output_dir or os.path.normpath(os.path.join(self.script_dir, '..', 'data', 'raw'))
         
         # Get the current date and time for unique filenames
         self.current_date_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -30,6 +32,10 @@ class DatasetCurator:
         self.test_size = 0.1
         self.random_seed = 42
 
+        # Registry recording every file written by the curator
+        self.registry = registry or ArtifactRegistry()
+        self.source_fingerprint = None
+
     def get_user_confirmation(self):
         """Get confirmation from the user before proceeding."""
         confirmation = input(f"""
@@ -81,6 +87,26 @@ Proceed? (y/n): """).strip().lower()
             
         return train_files, val_files, test_files
 
+    def get_config(self):
+        """Configuration that determines the curated output, recorded alongside each artifact."""
+        return {
+            "source_dir": self.repo_dir,
+            "enable_train_val_test_split": self.enable_train_val_test_split,
+            "train_size": self.train_size,
+            "val_size": self.val_size,
+            "test_size": self.test_size,
+            "random_seed": self.random_seed,
+        }
+
+    @staticmethod
+    def fingerprint_sources(bal_files):
+        """Hash the source file list by path, size and modification time without reading the files."""
+        entries = []
+        for file in bal_files:
+            stat = os.stat(file)
+            entries.append(f"{file}:{stat.st_size}:{stat.st_mtime_ns}")
+        return ArtifactRegistry.hash_inputs(entries)
+
     def read_files(self, file_list):
         """Read the contents of all files in the list."""
         return [open(file, 'r', encoding='utf-8').read() for file in file_list]
@@ -100,6 +126,7 @@ Proceed? (y/n): """).strip().lower()
         
         # Collect files
         bal_files = self.collect_bal_files()
+        self.source_fingerprint = self.fingerprint_sources(bal_files)
         
         # Split dataset
         train_files, val_files, test_files = self.split_dataset(bal_files)
@@ -118,22 +145,29 @@ Proceed? (y/n): """).strip().lower()
             
         return train_data, val_data, test_data
 
-    def save_datasets(self, train_data, val_data, test_data):
-        """Save the datasets to output files."""
+    def save_datasets(self, train_data, val_data, test_data, input_hash=None):
+        """Save the datasets to output files and register them as artifacts."""
         print("=== Started writing the dataset ===")
         if self.enable_train_val_test_split:
-            # Save the datasets to text files
-            with open(os.path.join(self.output_dir, self.train_output_file), 'w', encoding='utf-8') as f:
-                f.write('\n'.join(train_data))
-            with open(os.path.join(self.output_dir, self.val_output_file), 'w', encoding='utf-8') as f:
-                f.write('\n'.join(val_data))
-            with open(os.path.join(self.output_dir, self.test_output_file), 'w', encoding='utf-8') as f:
-                f.write('\n'.join(test_data))
+            outputs = [
+                (self.train_output_file, train_data, 'train'),
+                (self.val_output_file, val_data, 'val'),
+                (self.test_output_file, test_data, 'test'),
+            ]
         else:
-            # Save the dataset to a single text file
-            with open(os.path.join(self.output_dir, self.dataset_output_file), 'w', encoding='utf-8') as f:
-                f.write('\n'.join(train_data))
+            outputs = [(self.dataset_output_file, train_data, 'dataset')]
+
+        artifacts = {}
+        config = self.get_config()
+        for filename, data, tag in outputs:
+            output_path = os.path.join(self.output_dir, filename)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(data))
+            artifacts[tag] = self.registry.register(output_path, stage='curate', tags=[tag], config=config,
+                                                    row_count=len(data),
+                                                    input_hash=input_hash or self.source_fingerprint)
         print("=== Finished writing the dataset ===")
+        return artifacts
 
     def run(self):
         """Main method to execute the dataset curation process."""
@@ -1,16 +1,17 @@
 import json
 import os
-import re
 from pprint import pprint
 import regex_patterns 
 
+from artifact_registry import ArtifactRegistry
 from utils import get_most_recent_file_with_prefix
 
 
 class DatasetFormatter:
     """Class for formatting already **curated** code datasets in `raw` directory into blocks and ChatML format."""
 
-    def __init__(self, source_dir=None, output_dir=None, chatml_dir=None, enable_split=False):
+    def __init__(self, source_dir=None, output_dir=None, chatml_dir=None, enable_split=False, registry=None,
+                 token_budget=None):
         """Initialize the DatasetFormatter with directory paths and configuration."""
         script_dir = os.path.dirname(os.path.abspath(__file__))
         
@@ -19,6 +20,12 @@ class DatasetFormatter:
         self.output_dir = output_dir or os.path.normpath(os.path.join(script_dir, '..', 'data', 'block-formatted'))
         self.chatml_dir = chatml_dir or os.path.normpath(os.path.join(script_dir, '..', 'data', 'chatML'))
         self.enable_train_val_test_split = enable_split
+
+        # Registry used to look up the curated inputs and record the formatted outputs
+        self.registry = registry or ArtifactRegistry()
+
+        # Optional `TokenBudgetFilter` applied to the blocks before anything is written
+        self.token_budget = token_budget
         
         self.dataset_input_file = None
         self.train_input_file = None
@@ -54,13 +61,20 @@ Proceed? (y/n): """
             if not os.path.exists(directory):
                 os.makedirs(directory)
 
+    def _find_input_file(self, tag, prefix):
+        """Look up the most recent curated file in the registry, falling back to the filename timestamp."""
+        path = self.registry.latest_path(tag=tag)
+        if path and os.path.dirname(path) == os.path.abspath(self.source_dir):
+            return path
+        return get_most_recent_file_with_prefix(self.source_dir, prefix)
+
     def load_input_files(self):
         """Load the most recent dataset file paths."""
         print("=== Loading the most recent dataset files ===")
-        self.dataset_input_file = get_most_recent_file_with_prefix(self.source_dir, 'dataset_')
-        self.train_input_file = get_most_recent_file_with_prefix(self.source_dir, 'train_')
-        self.val_input_file = get_most_recent_file_with_prefix(self.source_dir, 'val_')
-        self.test_input_file = get_most_recent_file_with_prefix(self.source_dir, 'test_')
+        self.dataset_input_file = self._find_input_file('dataset', 'dataset_')
+        self.train_input_file = self._find_input_file('train', 'train_')
+        self.val_input_file = self._find_input_file('val', 'val_')
+        self.test_input_file = self._find_input_file('test', 'test_')
 
         # Validate file availability based on chosen mode
         if self.enable_train_val_test_split:
@@ -71,9 +85,8 @@ Proceed? (y/n): """
 
     @staticmethod
     def extract_code_blocks(content):
-        combined_pattern = regex_patterns.pattern
-        blocks = re.findall(combined_pattern, content, re.DOTALL)
-        return blocks
+        """Extract code block headers using the precompiled pattern engine."""
+        return regex_patterns.engine.findall(content)
 
     @staticmethod
     def create_completion_pairs(code_blocks):
@@ -90,19 +103,23 @@ Proceed? (y/n): """
             })
         return pairs
 
+    @staticmethod
+    def to_chatml(pair):
+        """Convert an input-output pair to a ChatML entry."""
+        return {
+            "messages": [
+                {"role": "system", "content": "You are a Ballerina code completion assistant."},
+                {"role": "user", "content": f"Complete this Ballerina code:\n```ballerina\n{pair['input']}\n```"},
+                {"role": "assistant", "content": f"```ballerina\n{pair['output']}\n```"}
+            ]
+        }
+
     @staticmethod
     def format_chatml(pairs, output_file):
         """Convert input-output pairs to ChatML format and save as JSONL."""
         with open(output_file, 'w') as f:
             for pair in pairs:
-                chatml_entry = {
-                    "messages": [
-                        {"role": "system", "content": "You are a Ballerina code completion assistant."},
-                        {"role": "user", "content": f"Complete this Ballerina code:\n```ballerina\n{pair['input']}\n```"},
-                        {"role": "assistant", "content": f"```ballerina\n{pair['output']}\n```"}
-                    ]
-                }
-                f.write(json.dumps(chatml_entry) + '\n')
+                f.write(json.dumps(DatasetFormatter.to_chatml(pair)) + '\n')
 
     def process_dataset(self):
         """Process the dataset based on configuration."""
@@ -122,13 +139,76 @@ Proceed? (y/n): """
             # Process single dataset file
             return self._process_single_dataset()
             
+    def get_config(self):
+        """Configuration that determines the formatted output, recorded alongside each artifact."""
+        config = {
+            "pattern_hash": ArtifactRegistry.hash_config([(f.name, f.pattern) for f in regex_patterns.engine.families]),
+        }
+        if self.token_budget is not None:
+            config["token_budget"] = self.token_budget.get_config()
+        return config
+
+    def _get_input_artifact(self, path):
+        """Get the registry entry for an input file, registering it if it was produced outside the curator."""
+        artifact = self.registry.get_by_path(path)
+        if artifact is None or not self.registry.is_current(artifact):
+            # Re-registering re-hashes the content (its input hash defaults to that content hash),
+            # so outputs cached for the old content no longer match
+            tags = artifact['tags'] if artifact else ()
+            artifact = self.registry.register(path, stage='curate', tags=tags)
+        return artifact
+
+    def _apply_token_budget(self, blocks, dataset_artifact, config):
+        """Measure the blocks against the token budget, save the statistics and any routed blocks."""
+        print(f"=== Counting tokens ({self.token_budget.policy} at {self.token_budget.max_tokens} tokens) ===")
+        result = self.token_budget.apply(blocks)
+        self.token_budget.print_statistics(result["statistics"])
+
+        dataset_name = os.path.basename(self.dataset_input_file)
+        stats_output_file = os.path.join(self.output_dir, f'token_stats_{dataset_name}.json')
+        with open(stats_output_file, 'w', encoding='utf-8') as f:
+            json.dump(result["statistics"], f, indent=2)
+        self.registry.register(stats_output_file, stage='token_stats', parents=[dataset_artifact['id']], config=config)
+
+        if result["overflow"]:
+            overflow_output_file = os.path.join(self.output_dir, f'overflow_{dataset_name}.txt')
+            with open(overflow_output_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(result["overflow"]))
+            self.registry.register(overflow_output_file, stage='overflow', parents=[dataset_artifact['id']],
+                                   config=config, row_count=len(result["overflow"]))
+            print(f"Blocks routed over budget: {len(result['overflow'])} ({overflow_output_file})")
+
+        print(f"Blocks kept within budget: {len(result['blocks'])}")
+        return result["blocks"]
+
     def _process_single_dataset(self):
         """Process a single dataset file and generate formatted outputs."""
+        dataset_artifact = self._get_input_artifact(self.dataset_input_file)
+        config = self.get_config()
+
+        # Skip the work if the same input was already formatted with the same configuration
+        blocks_artifact = self.registry.find_cached('blocks', parents=[dataset_artifact['id']], config=config)
+        chatml_artifact = blocks_artifact and self.registry.find_cached('chatml', parents=[blocks_artifact['id']], config=config)
+        if chatml_artifact:
+            print("=== Inputs and configuration unchanged, reusing formatted outputs ===")
+            return {
+                "blocks_file": blocks_artifact['path'],
+                "chatml_file": chatml_artifact['path'],
+                "block_count": blocks_artifact['row_count'],
+                "pair_count": chatml_artifact['row_count']
+            }
+
         # Load and process the dataset file
         with open(self.dataset_input_file, 'r', encoding='utf-8') as f:
             all_data = f.read()
+            regex_patterns.engine.reset_stats()
             all_data_blocks = self.extract_code_blocks(all_data)
             print(f"Total code blocks found: {len(all_data_blocks)}")
+            for name, stats in regex_patterns.engine.get_stats()["families"].items():
+                print(f"  {name}: {stats['hits']} blocks, {stats['attempts']} attempts, {stats['seconds']:.3f}s")
+
+        if self.token_budget is not None:
+            all_data_blocks = self._apply_token_budget(all_data_blocks, dataset_artifact, config)
 
         # Save extracted code blocks
         print("=== Writing the extracted code blocks to file ===")
@@ -136,6 +216,8 @@ Proceed? (y/n): """
         blocks_output_file = os.path.join(self.output_dir, blocks_filename)
         with open(blocks_output_file, 'w', encoding='utf-8') as f:
             f.write('\n'.join(all_data_blocks))
+        blocks_artifact = self.registry.register(blocks_output_file, stage='blocks', parents=[dataset_artifact['id']],
+                                                 config=config, row_count=len(all_data_blocks))
         print("=== Finished writing code blocks ===")
 
         # Create and save input-output pairs
@@ -146,6 +228,8 @@ Proceed? (y/n): """
         chatml_filename = f'chat_{os.path.basename(self.dataset_input_file)}.jsonl'
         chatml_output_file = os.path.join(self.chatml_dir, chatml_filename)
         self.format_chatml(input_output_pairs, chatml_output_file)
+        self.registry.register(chatml_output_file, stage='chatml', parents=[blocks_artifact['id']],
+                               config=config, row_count=len(input_output_pairs))
         print("=== Finished writing input-output pairs ===")
         
         return {
@@ -0,0 +1,412 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from artifact_registry import ArtifactRegistry
+from curate_dataset import DatasetCurator
+from format_dataset import DatasetFormatter
+from token_budget import TokenBudgetFilter
+
+
+class PipelineStage:
+    """Base class for a pipeline stage with declared inputs and a memoizable output.
+
+    A stage receives the artifacts produced by the stages named in `inputs` and returns
+    a dict of its own output artifacts. Outputs are memoized in the registry by the hash
+    of the input artifacts plus `get_config()`.
+
+    Stages that implement `shards()` are run one shard at a time. Every finished shard is
+    registered, so an interrupted run resumes after the last completed shard.
+    """
+
+    name = None
+    inputs = ()
+    # Output whose rows and size are reported as the stage throughput
+    primary_output = 'output'
+
+    def get_config(self):
+        """Configuration that determines the stage output."""
+        return {}
+
+    def get_input_hash(self, inputs):
+        """Hash identifying the stage inputs. Defaults to the content hashes of the input artifacts."""
+        return ArtifactRegistry.hash_inputs(
+            artifact['sha256'] for artifacts in inputs.values() for artifact in artifacts.values())
+
+    def find_cached(self, registry, inputs, input_hash):
+        """Return the memoized outputs for these inputs, or None if the stage has to run."""
+        artifact = registry.find_cached(self.name, config=self.get_config(), input_hash=input_hash)
+        return {'output': artifact} if artifact else None
+
+    def shards(self, inputs):
+        """List of shard descriptions, or None if the stage is not sharded."""
+        return None
+
+    def run_shard(self, shard, inputs, output_path):
+        """Process a single shard into `output_path`. Returns the number of rows written."""
+        raise NotImplementedError
+
+    def merge(self, shard_artifacts, inputs, registry, input_hash):
+        """Combine the shard outputs into the stage outputs. Returns a dict of artifacts."""
+        raise NotImplementedError
+
+    def run(self, inputs, registry, input_hash):
+        """Run an unsharded stage. Returns a dict of artifacts."""
+        raise NotImplementedError
+
+    @staticmethod
+    def concatenate(shard_artifacts, output_path, separator=''):
+        """Concatenate shard files into `output_path`, optionally separated by `separator`."""
+        with open(output_path, 'w', encoding='utf-8') as out:
+            for i, artifact in enumerate(shard_artifacts):
+                if i and separator:
+                    out.write(separator)
+                with open(artifact['path'], 'r', encoding='utf-8') as f:
+                    shutil.copyfileobj(f, out)
+
+
+class CurateStage(PipelineStage):
+    """Collect and read the `.bal` files into a single dataset file, in shards of `shard_size` files."""
+
+    name = 'curate'
+    primary_output = 'dataset'
+
+    def __init__(self, curator=None, shard_size=1000):
+        self.curator = curator or DatasetCurator()
+        if self.curator.enable_train_val_test_split:
+            raise ValueError("The pipeline writes a single curated dataset. Disable enable_train_val_test_split, "
+                             "or run curate_dataset.py to produce the train, validation and test files.")
+        self.shard_size = shard_size
+        self._bal_files = None
+
+    def get_config(self):
+        return {**self.curator.get_config(), "shard_size": self.shard_size}
+
+    def _collect(self):
+        """Collect the source files once per run."""
+        if self._bal_files is None:
+            curator = self.curator
+            if not os.path.exists(curator.repo_dir):
+                raise FileNotFoundError(f"The directory {curator.repo_dir} does not exist.")
+            if not os.listdir(curator.repo_dir):
+                raise ValueError(f"The directory {curator.repo_dir} is empty.")
+            curator.validate_split_ratios()
+            curator.set_random_seeds()
+            # Sort so shard membership, and with it the shard checkpoints, does not depend on os.walk order
+            self._bal_files, _, _ = curator.split_dataset(sorted(curator.collect_bal_files()))
+        return self._bal_files
+
+    def get_input_hash(self, inputs):
+        # The source files are not artifacts, so hash their paths, sizes and modification times
+        return self.curator.fingerprint_sources(self._collect())
+
+    def find_cached(self, registry, inputs, input_hash):
+        artifact = registry.find_cached(self.name, config=self.get_config(), input_hash=input_hash)
+        return {'dataset': artifact} if artifact else None
+
+    def shards(self, inputs):
+        bal_files = self._collect()
+        return [bal_files[i:i + self.shard_size] for i in range(0, len(bal_files), self.shard_size)]
+
+    def run_shard(self, shard, inputs, output_path):
+        data = self.curator.read_files(shard)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(data))
+        return len(data)
+
+    def merge(self, shard_artifacts, inputs, registry, input_hash):
+        os.makedirs(self.curator.output_dir, exist_ok=True)
+        output_path = os.path.join(self.curator.output_dir, self.curator.dataset_output_file)
+        # Joining the shards with a newline gives the same file as `DatasetCurator.save_datasets`
+        self.concatenate(shard_artifacts, output_path, separator='\n')
+        artifact = registry.register(output_path, stage=self.name, tags=['dataset'], config=self.get_config(),
+                                     row_count=sum(a['row_count'] for a in shard_artifacts), input_hash=input_hash)
+        return {'dataset': artifact}
+
+
+class FormatStage(PipelineStage):
+    """Extract code blocks from the curated dataset and write the blocks and ChatML files."""
+
+    name = 'format'
+    inputs = ('curate',)
+    primary_output = 'chatml'
+
+    def __init__(self, formatter=None):
+        self.formatter = formatter or DatasetFormatter()
+
+    def get_config(self):
+        return self.formatter.get_config()
+
+    def find_cached(self, registry, inputs, input_hash):
+        # The formatter records its outputs itself, so it has to write to the pipeline's registry
+        self.formatter.registry = registry
+        dataset = inputs['curate']['dataset']
+        blocks = registry.find_cached('blocks', parents=[dataset['id']], config=self.get_config())
+        chatml = blocks and registry.find_cached('chatml', parents=[blocks['id']], config=self.get_config())
+        return {'blocks': blocks, 'chatml': chatml} if chatml else None
+
+    def run(self, inputs, registry, input_hash):
+        formatter = self.formatter
+        formatter.registry = registry
+        formatter.setup_directories()
+        formatter.dataset_input_file = inputs['curate']['dataset']['path']
+        result = formatter.process_dataset()
+        outputs = {
+            'blocks': registry.get_by_path(result['blocks_file']),
+            'chatml': registry.get_by_path(result['chatml_file']),
+        }
+        missing = [name for name, artifact in outputs.items() if artifact is None]
+        if missing:
+            raise RuntimeError(f"The formatter did not register its {missing} outputs in the pipeline registry "
+                               f"{registry.db_path}.")
+        return outputs
+
+
+class TokenizeStage(PipelineStage):
+    """Tokenize the ChatML conversations with the model's chat template, in shards of `shard_size` lines."""
+
+    name = 'tokenize'
+    inputs = ('format',)
+
+    def __init__(self, tokenizer_name='Qwen/Qwen2.5-Coder-0.5B', output_dir=None, shard_size=10000):
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.tokenizer_name = tokenizer_name
+        self.output_dir = output_dir or os.path.normpath(os.path.join(script_dir, '..', 'data', 'tokenized'))
+        self.shard_size = shard_size
+        self._tokenizer = None
+
+    @property
+    def tokenizer(self):
+        """Load the tokenizer on first use, so cached runs never import transformers."""
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name, use_fast=True)
+        return self._tokenizer
+
+    def get_config(self):
+        return {"tokenizer_name": self.tokenizer_name, "shard_size": self.shard_size}
+
+    def get_input_hash(self, inputs):
+        return ArtifactRegistry.hash_inputs([inputs['format']['chatml']['sha256']])
+
+    def shards(self, inputs):
+        """Byte ranges of every `shard_size` lines of the ChatML file, found in a single pass."""
+        shards = []
+        start = offset = lines = 0
+        with open(inputs['format']['chatml']['path'], 'rb') as f:
+            for line in f:
+                offset += len(line)
+                lines += 1
+                if lines == self.shard_size:
+                    shards.append((start, offset))
+                    start, lines = offset, 0
+        if lines:
+            shards.append((start, offset))
+        return shards
+
+    def run_shard(self, shard, inputs, output_path):
+        start, end = shard
+        with open(inputs['format']['chatml']['path'], 'rb') as f:
+            f.seek(start)
+            lines = f.read(end - start).decode('utf-8').split('\n')
+        conversations = [json.loads(line)['messages'] for line in lines if line.strip()]
+
+        input_ids = self.tokenizer.apply_chat_template(conversations, tokenize=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for ids in input_ids:
+                f.write(json.dumps({"input_ids": ids}) + '\n')
+        return len(input_ids)
+
+    def merge(self, shard_artifacts, inputs, registry, input_hash):
+        os.makedirs(self.output_dir, exist_ok=True)
+        chatml_name = os.path.splitext(os.path.basename(inputs['format']['chatml']['path']))[0]
+        output_path = os.path.join(self.output_dir, f'tokens_{chatml_name}.jsonl')
+        self.concatenate(shard_artifacts, output_path)
+        artifact = registry.register(output_path, stage=self.name, parents=[inputs['format']['chatml']['id']],
+                                     config=self.get_config(), row_count=sum(a['row_count'] for a in shard_artifacts))
+        return {'output': artifact}
+
+
+class Pipeline:
+    """Non-interactive runner for a DAG of `PipelineStage`s.
+
+    Stages are submitted as soon as all of their inputs are available, outputs are memoized
+    in the artifact registry, and timing and throughput are reported for each stage.
+    """
+
+    def __init__(self, stages, registry=None, work_dir=None, max_workers=4):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages (list): Stages to run. Every name in a stage's `inputs` must be one of them.
+            registry (ArtifactRegistry): Registry used for memoization and shard checkpoints
+            work_dir (str): Directory holding in-progress shard outputs
+            max_workers (int): Maximum number of stages running at the same time
+        """
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.stages = {stage.name: stage for stage in stages}
+        self.registry = registry or ArtifactRegistry()
+        self.work_dir = work_dir or os.path.normpath(os.path.join(script_dir, '..', 'data', '.pipeline'))
+        self.max_workers = max_workers
+        self.report = {}
+
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {missing}")
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        """Raise ValueError if the stage dependencies contain a cycle."""
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependencies contain a cycle through {name}")
+            visiting.add(name)
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            visiting.remove(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _run_sharded(self, stage, shards, inputs, input_hash):
+        """Run the shards of a stage, skipping the ones already registered for these inputs."""
+        shard_dir = os.path.join(self.work_dir, stage.name, input_hash[:16])
+        os.makedirs(shard_dir, exist_ok=True)
+        shard_stage = f'{stage.name}.shard'
+        config = stage.get_config()
+
+        shard_artifacts = []
+        resumed = 0
+        for index, shard in enumerate(shards):
+            shard_hash = ArtifactRegistry.hash_inputs([input_hash, f'shard:{index}'])
+            artifact = self.registry.find_cached(shard_stage, config=config, input_hash=shard_hash)
+            if artifact is None:
+                output_path = os.path.join(shard_dir, f'part-{index:05d}')
+                row_count = stage.run_shard(shard, inputs, output_path)
+                artifact = self.registry.register(output_path, stage=shard_stage, config=config,
+                                                  row_count=row_count, input_hash=shard_hash)
+            else:
+                resumed += 1
+            shard_artifacts.append(artifact)
+
+        if resumed:
+            print(f"[{stage.name}] Resumed: {resumed}/{len(shards)} shards already completed")
+
+        outputs = stage.merge(shard_artifacts, inputs, self.registry, input_hash)
+        # The shards are only needed until the merged output is registered
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        return outputs
+
+    def _run_stage(self, stage, inputs):
+        """Run one stage (or reuse its memoized outputs) and record its timing and throughput."""
+        start = time.perf_counter()
+        input_hash = stage.get_input_hash(inputs)
+        outputs = stage.find_cached(self.registry, inputs, input_hash)
+        cached = outputs is not None
+
+        if cached:
+            print(f"[{stage.name}] Inputs and configuration unchanged, reusing outputs")
+        else:
+            print(f"=== Running stage {stage.name} ===")
+            shards = stage.shards(inputs)
+            if shards is None:
+                outputs = stage.run(inputs, self.registry, input_hash)
+            else:
+                outputs = self._run_sharded(stage, shards, inputs, input_hash)
+
+        elapsed = time.perf_counter() - start
+        primary = outputs[stage.primary_output]
+        rows = primary['row_count'] or 0
+        size_mb = primary['size_bytes'] / (1024 ** 2)
+        self.report[stage.name] = {
+            "cached": cached,
+            "seconds": elapsed,
+            "rows": rows,
+            "output_MB": size_mb,
+            # A cache lookup produces nothing, so it has no throughput
+            "rows_per_second": rows / elapsed if elapsed > 0 and not cached else None,
+            "MB_per_second": size_mb / elapsed if elapsed > 0 and not cached else None,
+        }
+        return outputs
+
+    def run(self):
+        """
+        Run all stages, each as soon as its inputs are ready.
+
+        Returns:
+            dict: Output artifacts of every stage, keyed by stage name
+        """
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                ready = [name for name, stage in pending.items() if all(dep in results for dep in stage.inputs)]
+                for name in ready:
+                    stage = pending.pop(name)
+                    inputs = {dep: results[dep] for dep in stage.inputs}
+                    running[executor.submit(self._run_stage, stage, inputs)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    # Re-raises the stage's exception; stages already submitted still finish
+                    results[name] = future.result()
+
+        return results
+
+    def print_report(self):
+        """Print per-stage timing and throughput."""
+        print("\n=== Pipeline Summary ===")
+        print(f"{'stage':<12}{'status':<10}{'seconds':>10}{'rows':>12}{'rows/s':>12}{'MB':>10}{'MB/s':>10}")
+        for name, stats in self.report.items():
+            status = 'cached' if stats['cached'] else 'ran'
+            rows_per_second = '-' if stats['rows_per_second'] is None else f"{stats['rows_per_second']:.1f}"
+            mb_per_second = '-' if stats['MB_per_second'] is None else f"{stats['MB_per_second']:.2f}"
+            print(f"{name:<12}{status:<10}{stats['seconds']:>10.2f}{stats['rows']:>12}"
+                  f"{rows_per_second:>12}{stats['output_MB']:>10.2f}{mb_per_second:>10}")
+
+
+def main():
+    """Entry point of the script."""
+    parser = argparse.ArgumentParser(description="Run the curate -> format -> tokenize pipeline without prompts.")
+    parser.add_argument('--source-dir', default=None, help="Directory with the .bal files")
+    parser.add_argument('--skip-tokenize', action='store_true', help="Stop after writing the ChatML file")
+    parser.add_argument('--tokenizer', default='Qwen/Qwen2.5-Coder-0.5B', help="Tokenizer used by the tokenize stage")
+    parser.add_argument('--max-tokens', type=int, default=None,
+                        help="Token budget per sample. Blocks are measured and filtered before they are written")
+    parser.add_argument('--token-policy', choices=TokenBudgetFilter.POLICIES, default='filter',
+                        help="What to do with blocks over --max-tokens")
+    parser.add_argument('--curate-shard-size', type=int, default=1000, help="Number of .bal files per curate shard")
+    parser.add_argument('--tokenize-shard-size', type=int, default=10000, help="Number of conversations per tokenize shard")
+    args = parser.parse_args()
+
+    registry = ArtifactRegistry()
+    token_budget = None
+    if args.max_tokens:
+        token_budget = TokenBudgetFilter(tokenizer_name=args.tokenizer, max_tokens=args.max_tokens, policy=args.token_policy)
+    stages = [
+        CurateStage(DatasetCurator(source_dir=args.source_dir, registry=registry), shard_size=args.curate_shard_size),
+        FormatStage(DatasetFormatter(registry=registry, token_budget=token_budget)),
+    ]
+    if not args.skip_tokenize:
+        stages.append(TokenizeStage(tokenizer_name=args.tokenizer, shard_size=args.tokenize_shard_size))
+
+    pipeline = Pipeline(stages, registry=registry)
+    pipeline.run()
+    pipeline.print_report()
+
+
+if __name__ == "__main__":
+    main()
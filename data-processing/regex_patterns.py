@@ -7,6 +7,7 @@
 # # Combined regex pattern to match both function and service definitions
 # pattern = rf'({function_pattern}|{service_pattern})'
 import re
+import time
 
 # Function pattern as a separate variable
 function_pattern = r'''
@@ -69,6 +70,46 @@ service_pattern = r'''
     \{                              # Opening brace for service
 '''
 
+# Class pattern as a separate variable
+class_pattern = r'''
+    \s*                             # Optional leading whitespace
+    (?:                             # Optional modifiers for class
+        (?:public|private)?\s*      # Visibility modifier
+        (?:(?:isolated|readonly|client|service|distinct)\s+)*  # Class qualifiers
+    )?
+    class\s+                        # Required 'class' keyword
+    [a-zA-Z_]\w*                    # Class name
+    \s*
+    \{                              # Opening brace for class
+'''
+
+# Type definition pattern (record and object types) as a separate variable
+type_pattern = r'''
+    \s*                             # Optional leading whitespace
+    (?:(?:public|private)\s+)?      # Visibility modifier
+    type\s+                         # Required 'type' keyword
+    [a-zA-Z_]\w*                    # Type name
+    \s+
+    (?:readonly\s*&\s*)?             # Optional readonly intersection
+    (?:record|object)\s*            # Structured type descriptor
+    \{\|?                           # Opening brace (optionally closed record)
+'''
+
+# Resource function pattern as a separate variable
+resource_pattern = r'''
+    \s*                             # Optional leading whitespace
+    (?:isolated\s+)?                # Resource function modifier
+    resource\s+                     # Required 'resource' keyword
+    function\s+
+    [a-zA-Z_]\w*                    # Accessor (get, post, ...)
+    \s+
+    [^(){};]*                       # Resource path
+    \([^)]*\)                       # Parameters
+    \s*
+    (?:returns\s+[^{;]+)?           # Optional return type
+    \{                              # Opening brace for resource function
+'''
+
 # Combine the patterns
 pattern = rf'''
     (?:
@@ -76,4 +117,126 @@ pattern = rf'''
         |
         {service_pattern}
     )
-'''
\ No newline at end of file
+'''
+
+
+class PatternFamily:
+    """A compiled construct pattern with the literal keyword used to prefilter candidates.
+
+    Every family pattern starts with optional whitespace and modifier words followed by
+    `keyword`, so a match can only start within the whitespace/modifiers right before an
+    occurrence of the keyword.
+    """
+
+    def __init__(self, name, keyword, modifiers, pattern):
+        self.name = name
+        self.keyword = keyword
+        self.modifiers = tuple(modifiers)
+        self.pattern = pattern
+        self.regex = re.compile(pattern, re.VERBOSE | re.DOTALL)
+
+
+# Registered families, in the order they are tried when several match at the same position
+FAMILIES = {
+    'function': PatternFamily('function', 'function',
+                              ('public', 'private', 'isolated', 'remote', 'transactional', 'worker'), function_pattern),
+    'service': PatternFamily('service', 'service', ('public', 'private', 'isolated'), service_pattern),
+    'class': PatternFamily('class', 'class',
+                           ('public', 'private', 'isolated', 'readonly', 'client', 'service', 'distinct'), class_pattern),
+    'type': PatternFamily('type', 'type', ('public', 'private'), type_pattern),
+    'resource': PatternFamily('resource', 'resource', ('isolated',), resource_pattern),
+}
+
+# Families matched by `pattern`, used by default by the formatter
+DEFAULT_FAMILIES = ('function', 'service')
+
+
+class PatternEngine:
+    """Find all construct matches, running the full patterns only near candidate keywords.
+
+    A single literal alternation of the family keywords finds the next candidate. The match
+    start is then searched only between the candidate and the whitespace/modifier words right
+    before it, so text without any keyword is skipped at the speed of a literal scan.
+
+    `findall` returns the same matches as `re.findall` over the alternation of the families,
+    in order. Hit counts, attempts and time spent are recorded per family.
+    """
+
+    def __init__(self, families=DEFAULT_FAMILIES):
+        """
+        Initialize the engine.
+
+        Args:
+            families (iterable): Names of registered families or `PatternFamily` instances
+        """
+        self.families = [FAMILIES[f] if isinstance(f, str) else f for f in families]
+        keywords = sorted({f.keyword for f in self.families}, key=len, reverse=True)
+        self.prefilter = re.compile('|'.join(re.escape(k) for k in keywords))
+        self.modifiers = tuple(sorted({m for f in self.families for m in f.modifiers}))
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the per-family statistics."""
+        self.candidates = 0
+        self.stats = {f.name: {"hits": 0, "attempts": 0, "seconds": 0.0} for f in self.families}
+
+    def get_stats(self):
+        """Per-family hit counts, match attempts and time spent, plus the number of prefilter candidates."""
+        return {"candidates": self.candidates, "families": {name: dict(s) for name, s in self.stats.items()}}
+
+    def _candidate_start(self, text, keyword_pos, lower_bound):
+        """Earliest position a match containing the keyword at `keyword_pos` could start."""
+        start = keyword_pos
+        while start > lower_bound:
+            if text[start - 1].isspace():
+                start -= 1
+                continue
+            for modifier in self.modifiers:
+                if text.endswith(modifier, lower_bound, start):
+                    start -= len(modifier)
+                    break
+            else:
+                break
+        return start
+
+    def _match_at(self, text, start, end):
+        """Leftmost match starting between `start` and `end` (inclusive), trying families in order."""
+        stats = self.stats
+        for pos in range(start, end + 1):
+            # Every pattern starts with \s*, so if it failed one position earlier on whitespace it fails here too
+            if pos > start and text[pos - 1].isspace():
+                continue
+            for family in self.families:
+                family_stats = stats[family.name]
+                t0 = time.perf_counter()
+                match = family.regex.match(text, pos)
+                family_stats["seconds"] += time.perf_counter() - t0
+                family_stats["attempts"] += 1
+                if match:
+                    family_stats["hits"] += 1
+                    return match
+        return None
+
+    def finditer(self, text):
+        """Yield the matches in `text` from left to right, without overlaps."""
+        pos = 0
+        while True:
+            candidate = self.prefilter.search(text, pos)
+            if candidate is None:
+                return
+            self.candidates += 1
+            keyword_pos = candidate.start()
+            match = self._match_at(text, self._candidate_start(text, keyword_pos, pos), keyword_pos)
+            if match:
+                yield match
+                pos = match.end()
+            else:
+                pos = keyword_pos + 1
+
+    def findall(self, text):
+        """Return all matched strings in `text`."""
+        return [match.group(0) for match in self.finditer(text)]
+
+
+# Compiled once at import
+engine = PatternEngine()
\ No newline at end of file
@@ -0,0 +1,207 @@
+import numpy as np
+
+
+class TokenBudgetFilter:
+    """Count tokens for every code block and filter, split or route them against a token budget.
+
+    The length of a block is measured as the trainer sees it: the ChatML sample built from the
+    block (see `DatasetFormatter.to_chatml`) rendered with the model's chat template. This is
+    estimated as the block tokens, plus the tokens of its first line (the completion prompt),
+    plus the fixed tokens the template adds around an empty sample.
+
+    Policies for blocks over the budget:
+        - `filter`: drop them
+        - `split`: split them on line boundaries into chunks that each fit the budget
+        - `route`: keep them out of the training set and return them separately
+    """
+
+    POLICIES = ('filter', 'split', 'route')
+
+    def __init__(self, tokenizer_name='Qwen/Qwen2.5-Coder-0.5B', max_tokens=512, policy='filter',
+                 batch_size=1000, histogram_bins=20):
+        """
+        Initialize the filter.
+
+        Args:
+            tokenizer_name (str): Hugging Face tokenizer to count tokens with
+            max_tokens (int): Token budget per sample, matching the trainer's `max_length`
+            policy (str): One of `filter`, `split` or `route`
+            batch_size (int): Number of texts per tokenizer call
+            histogram_bins (int): Number of bins in the length histogram
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Policy must be one of {self.POLICIES}.")
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive.")
+
+        self.tokenizer_name = tokenizer_name
+        self.max_tokens = max_tokens
+        self.policy = policy
+        self.batch_size = batch_size
+        self.histogram_bins = histogram_bins
+        self._tokenizer = None
+        self._template_overhead = None
+
+    @property
+    def tokenizer(self):
+        """Load the fast tokenizer on first use."""
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name, use_fast=True)
+        return self._tokenizer
+
+    def get_config(self):
+        """Configuration that determines the filtered output."""
+        return {
+            "tokenizer_name": self.tokenizer_name,
+            "max_tokens": self.max_tokens,
+            "policy": self.policy,
+        }
+
+    def count_tokens(self, texts):
+        """
+        Count the tokens of each text, one tokenizer call per batch.
+
+        The fast tokenizer's Rust batch encoder already spreads a batch across all cores.
+
+        Args:
+            texts (list): Texts to count
+
+        Returns:
+            np.ndarray: Token count per text
+        """
+        if not texts:
+            return np.zeros(0, dtype=np.int64)
+
+        tokenizer = self.tokenizer
+        counts = []
+        for i in range(0, len(texts), self.batch_size):
+            encoded = tokenizer(texts[i:i + self.batch_size], add_special_tokens=False, return_attention_mask=False)
+            counts.extend(len(ids) for ids in encoded['input_ids'])
+        return np.asarray(counts, dtype=np.int64)
+
+    @property
+    def template_overhead(self):
+        """Tokens added by the chat template around an empty completion sample."""
+        if self._template_overhead is None:
+            from format_dataset import DatasetFormatter
+            messages = DatasetFormatter.to_chatml({"input": "", "output": ""})["messages"]
+            rendered = self.tokenizer.apply_chat_template(messages, tokenize=False)
+            self._template_overhead = int(self.count_tokens([rendered])[0])
+        return self._template_overhead
+
+    def sample_lengths(self, blocks):
+        """Estimated token length of the ChatML sample built from each block."""
+        prompts = ['\n'.join(block.split('\n')[:1]).strip() for block in blocks]
+        return self.count_tokens([block.strip() for block in blocks]) + self.count_tokens(prompts) + self.template_overhead
+
+    def compute_statistics(self, lengths):
+        """
+        Summarize sample lengths against the budget.
+
+        Args:
+            lengths (np.ndarray): Token length per sample
+
+        Returns:
+            dict: Count, mean, min/max, percentiles, histogram and how many samples exceed the budget
+        """
+        if len(lengths) == 0:
+            return {"count": 0, "max_tokens": self.max_tokens}
+
+        counts, edges = np.histogram(lengths, bins=self.histogram_bins)
+        over_budget = int(np.count_nonzero(lengths > self.max_tokens))
+        return {
+            "count": int(len(lengths)),
+            "max_tokens": self.max_tokens,
+            "total_tokens": int(lengths.sum()),
+            "mean": float(lengths.mean()),
+            "min": int(lengths.min()),
+            "max": int(lengths.max()),
+            "percentiles": {f"p{q}": float(v) for q, v in zip((50, 90, 95, 99), np.percentile(lengths, (50, 90, 95, 99)))},
+            "over_budget": over_budget,
+            "over_budget_fraction": over_budget / len(lengths),
+            # Tokens the trainer would discard by truncating at the budget
+            "truncated_tokens": int(np.maximum(lengths - self.max_tokens, 0).sum()),
+            "histogram": {"counts": counts.tolist(), "bin_edges": edges.tolist()},
+        }
+
+    @staticmethod
+    def print_statistics(stats):
+        """Print the statistics and a text histogram."""
+        if not stats["count"]:
+            print("No samples to summarize.")
+            return
+        percentiles = ', '.join(f"{k}={v:.0f}" for k, v in stats["percentiles"].items())
+        print(f"Samples: {stats['count']}, tokens: {stats['total_tokens']}, mean: {stats['mean']:.1f}, "
+              f"min: {stats['min']}, max: {stats['max']}")
+        print(f"Percentiles: {percentiles}")
+        print(f"Over budget ({stats['max_tokens']} tokens): {stats['over_budget']} "
+              f"({stats['over_budget_fraction']:.1%}), {stats['truncated_tokens']} tokens would be truncated")
+
+        counts = stats["histogram"]["counts"]
+        edges = stats["histogram"]["bin_edges"]
+        widest = max(counts) or 1
+        for count, low, high in zip(counts, edges, edges[1:]):
+            bar = '#' * int(40 * count / widest)
+            print(f"{low:>8.0f} - {high:<8.0f} {count:>8} {bar}")
+
+    def _split_block(self, block, line_lengths):
+        """Greedily split a block on line boundaries into chunks whose estimated sample length fits the budget."""
+        chunks, current, current_tokens, prompt_tokens = [], [], 0, 0
+        for line, tokens in zip(block.split('\n'), line_lengths):
+            # Each line costs its tokens plus roughly one for the newline
+            cost = int(tokens) + 1
+            if current and current_tokens + cost + prompt_tokens + self.template_overhead > self.max_tokens:
+                chunks.append('\n'.join(current))
+                current, current_tokens = [], 0
+            if not current:
+                # The first line of a chunk is repeated as its completion prompt
+                prompt_tokens = int(tokens)
+            current.append(line)
+            current_tokens += cost
+        if current:
+            chunks.append('\n'.join(current))
+        return [chunk for chunk in chunks if chunk.strip()]
+
+    def apply(self, blocks):
+        """
+        Measure the blocks and apply the budget policy.
+
+        Args:
+            blocks (list): Code blocks
+
+        Returns:
+            dict: `blocks` to keep (in their original order), `overflow` blocks routed out of the
+                  training set (route policy only) and `statistics` of the lengths before filtering
+        """
+        lengths = self.sample_lengths(blocks)
+        stats = self.compute_statistics(lengths)
+        within = lengths <= self.max_tokens
+
+        if self.policy != 'split':
+            kept = [block for block, fits in zip(blocks, within) if fits]
+            overflow = [block for block, fits in zip(blocks, within) if not fits] if self.policy == 'route' else []
+            return {"blocks": kept, "overflow": overflow, "statistics": stats}
+
+        # Count every line of the long blocks in one parallel pass
+        long_blocks = [block for block, fits in zip(blocks, within) if not fits]
+        split_lines = [block.split('\n') for block in long_blocks]
+        line_lengths = self.count_tokens([line for lines in split_lines for line in lines])
+        chunks_per_block, offset = [], 0
+        for block, lines in zip(long_blocks, split_lines):
+            chunks_per_block.append(self._split_block(block, line_lengths[offset:offset + len(lines)]))
+            offset += len(lines)
+
+        # The split is an estimate; re-measure the chunks and drop any that still do not fit,
+        # such as a single line longer than the budget
+        all_chunks = [chunk for chunks in chunks_per_block for chunk in chunks]
+        chunk_fits = iter(self.sample_lengths(all_chunks) <= self.max_tokens) if all_chunks else iter(())
+
+        kept, long_index = [], 0
+        for block, fits in zip(blocks, within):
+            if fits:
+                kept.append(block)
+                continue
+            kept.extend(chunk for chunk in chunks_per_block[long_index] if next(chunk_fits))
+            long_index += 1
+        return {"blocks": kept, "overflow": [], "statistics": stats}
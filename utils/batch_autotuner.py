@@ -0,0 +1,223 @@
+import itertools
+import time
+from typing import Callable, Dict, List, Optional
+
+import psutil
+import torch
+
+from fine_tuning_profiler import ResourceMonitor
+
+
+class BatchSizeAutotuner:
+    """Pick the training batch configuration with the highest throughput that fits in memory.
+
+    Each candidate combination of `per_device_train_batch_size`, `gradient_accumulation_steps`
+    and `max_length` is run for a few optimizer steps while a `ResourceMonitor` samples memory
+    and utilization. The optimizer uses a learning rate of 0, so the trials allocate the same
+    gradients and optimizer state as real training without changing the model weights.
+
+    Works on CPU (e.g. with a tiny model for testing) as well as on CUDA devices.
+    """
+
+    def __init__(self, model, batch_sizes=(1, 2, 4, 8, 16), gradient_accumulation_steps=(1,), max_lengths=(512,),
+                 memory_limit_gb: Optional[float] = None, trial_steps=3, warmup_steps=1,
+                 make_batch: Optional[Callable] = None, device=None, monitor_interval=0.2,
+                 metric='samples_per_second', verbose=True):
+        """
+        Initialize the autotuner.
+
+        Args:
+            model: Causal LM (e.g. from `AutoModelForCausalLM`) called as `model(input_ids=..., labels=...)`
+            batch_sizes (tuple): Candidate per-device batch sizes
+            gradient_accumulation_steps (tuple): Candidate gradient accumulation steps
+            max_lengths (tuple): Candidate sequence lengths
+            memory_limit_gb (float): Memory ceiling in GB. Peak allocated GPU memory on CUDA, peak RSS of
+                                     this process on CPU. Defaults to no ceiling.
+            trial_steps (int): Timed optimizer steps per candidate
+            warmup_steps (int): Untimed optimizer steps before timing (allocator and kernel warmup)
+            make_batch (callable): `make_batch(batch_size, max_length)` returning a LongTensor of input ids.
+                                   Defaults to random tokens from the model's vocabulary.
+            device (str): Device to run on. Defaults to the model's device.
+            monitor_interval (float): ResourceMonitor sampling interval in seconds
+            metric (str): `samples_per_second` or `tokens_per_second`. Shorter `max_length` candidates
+                          always win on samples/sec, so use tokens/sec when comparing sequence lengths.
+            verbose (bool): Whether to print each trial
+        """
+        self.model = model
+        self.batch_sizes = sorted(batch_sizes)
+        self.gradient_accumulation_steps = sorted(gradient_accumulation_steps)
+        self.max_lengths = sorted(max_lengths)
+        self.memory_limit_gb = memory_limit_gb
+        self.trial_steps = trial_steps
+        self.warmup_steps = warmup_steps
+        self.make_batch = make_batch or self._random_batch
+        self.device = torch.device(device) if device else next(model.parameters()).device
+        self.monitor_interval = monitor_interval
+        if metric not in ('samples_per_second', 'tokens_per_second'):
+            raise ValueError("Metric must be 'samples_per_second' or 'tokens_per_second'.")
+        self.metric = metric
+        self.verbose = verbose
+        self.results: List[Dict] = []
+        self._process = psutil.Process()
+        self._peak_rss = 0
+
+    def _random_batch(self, batch_size, max_length):
+        """Random token ids, the same shape a padded training batch would have."""
+        vocab_size = self.model.config.vocab_size
+        return torch.randint(0, vocab_size, (batch_size, max_length))
+
+    def _observe_rss(self):
+        """Track the peak RSS of this process. System-wide RAM also counts other processes and the page cache."""
+        self._peak_rss = max(self._peak_rss, self._process.memory_info().rss)
+
+    def _train_step(self, optimizer, batch_size, accumulation_steps, max_length):
+        """Run one optimizer step over `accumulation_steps` micro-batches."""
+        for _ in range(accumulation_steps):
+            input_ids = self.make_batch(batch_size, max_length).to(self.device)
+            output = self.model(input_ids=input_ids, labels=input_ids)
+            loss = output.loss if hasattr(output, 'loss') else output
+            # Activations are largest between the forward and backward passes
+            self._observe_rss()
+            (loss / accumulation_steps).backward()
+        optimizer.step()
+        self._observe_rss()
+        optimizer.zero_grad(set_to_none=True)
+
+    def _synchronize(self):
+        if self.device.type == 'cuda':
+            torch.cuda.synchronize(self.device)
+
+    @staticmethod
+    def _is_out_of_memory(error):
+        # On CPU a failed allocation is a RuntimeError from DefaultCPUAllocator ("can't allocate memory")
+        if isinstance(error, (MemoryError, torch.cuda.OutOfMemoryError)):
+            return True
+        message = str(error).lower()
+        return any(text in message for text in ('out of memory', "can't allocate memory", 'defaultcpuallocator'))
+
+    def _run_trial(self, batch_size, accumulation_steps, max_length):
+        """
+        Run a short trial of one configuration.
+
+        Returns:
+            dict: Configuration, throughput, peak memory and utilization, or the error if it failed
+        """
+        result = {
+            'per_device_train_batch_size': batch_size,
+            'gradient_accumulation_steps': accumulation_steps,
+            'max_length': max_length,
+        }
+        monitor = ResourceMonitor(interval=self.monitor_interval)
+        optimizer = torch.optim.AdamW(self.model.parameters(), lr=0.0)
+        self.model.train()
+        if self.device.type == 'cuda':
+            torch.cuda.reset_peak_memory_stats(self.device)
+        start_rss = self._peak_rss = self._process.memory_info().rss
+
+        try:
+            monitor.start()
+            for _ in range(self.warmup_steps):
+                self._train_step(optimizer, batch_size, accumulation_steps, max_length)
+            self._synchronize()
+
+            start = time.perf_counter()
+            for _ in range(self.trial_steps):
+                self._train_step(optimizer, batch_size, accumulation_steps, max_length)
+            self._synchronize()
+            elapsed = time.perf_counter() - start
+        except (RuntimeError, MemoryError) as e:
+            if not self._is_out_of_memory(e):
+                raise
+            result.update({'error': 'out of memory', 'fits': False})
+            return result
+        finally:
+            if monitor.monitoring:
+                monitor.stop()
+            # Make sure short trials have at least one sample taken while memory is still allocated
+            monitor.resource_log.append(monitor.sample(gpu=self.device.type == 'cuda'))
+            optimizer.zero_grad(set_to_none=True)
+            del optimizer
+            if self.device.type == 'cuda':
+                torch.cuda.empty_cache()
+
+        samples = self.trial_steps * batch_size * accumulation_steps
+        log = monitor.resource_log
+        if self.device.type == 'cuda':
+            # The allocator peak is exact; NVML samples also include the CUDA context and cache
+            peak_memory_gb = torch.cuda.max_memory_allocated(self.device) / (1024 ** 3)
+        else:
+            peak_memory_gb = self._peak_rss / (1024 ** 3)
+
+        result.update({
+            'samples_per_second': samples / elapsed,
+            'tokens_per_second': samples * max_length / elapsed,
+            'seconds_per_step': elapsed / self.trial_steps,
+            'peak_memory_GB': peak_memory_gb,
+            'peak_rss_GB': self._peak_rss / (1024 ** 3),
+            'trial_rss_increase_GB': (self._peak_rss - start_rss) / (1024 ** 3),
+            'peak_system_ram_GB': max(entry['memory_GB'] for entry in log),
+            'peak_gpu_mem_GB': max(entry['gpu_mem_GB'] for entry in log),
+            'avg_cpu_percent': sum(entry['cpu_percent'] for entry in log) / len(log),
+            'avg_gpu_util_percent': sum(entry['gpu_util_percent'] for entry in log) / len(log),
+        })
+        result['fits'] = self.memory_limit_gb is None or peak_memory_gb <= self.memory_limit_gb
+        return result
+
+    def run(self) -> Optional[Dict]:
+        """
+        Try every candidate configuration and return the fastest one (by `metric`) that fits the memory ceiling.
+
+        Larger batch sizes are skipped once a smaller one runs out of memory or exceeds the
+        ceiling for the same sequence length and accumulation steps.
+
+        Returns:
+            dict: Best configuration and its measurements, or None if no configuration fits
+        """
+        self.results = []
+        for max_length, accumulation_steps in itertools.product(self.max_lengths, self.gradient_accumulation_steps):
+            for batch_size in self.batch_sizes:
+                result = self._run_trial(batch_size, accumulation_steps, max_length)
+                self.results.append(result)
+                if self.verbose:
+                    self._print_result(result)
+                if not result['fits']:
+                    break
+
+        fitting = [r for r in self.results if r['fits']]
+        if not fitting:
+            return None
+        return max(fitting, key=lambda r: r[self.metric])
+
+    @staticmethod
+    def _print_result(result):
+        config = (f"batch={result['per_device_train_batch_size']:<4} accum={result['gradient_accumulation_steps']:<3} "
+                  f"max_length={result['max_length']:<5}")
+        if 'error' in result:
+            print(f"{config} {result['error']}")
+            return
+        status = 'ok' if result['fits'] else 'over memory limit'
+        print(f"{config} {result['samples_per_second']:>9.2f} samples/s "
+              f"{result['peak_memory_GB']:>7.2f} GB peak  {status}")
+
+    @staticmethod
+    def to_training_args(result: Dict) -> Dict:
+        """Keyword arguments for `TrainingArguments` and the tokenizer `max_length` from a trial result."""
+        return {
+            'per_device_train_batch_size': result['per_device_train_batch_size'],
+            'gradient_accumulation_steps': result['gradient_accumulation_steps'],
+            'max_length': result['max_length'],
+        }
+
+
+# Example Usage:
+if __name__ == "__main__":
+    from transformers import AutoModelForCausalLM
+
+    model = AutoModelForCausalLM.from_pretrained("Qwen/Qwen2.5-Coder-0.5B")
+    if torch.cuda.is_available():
+        model = model.to("cuda")
+
+    tuner = BatchSizeAutotuner(model, batch_sizes=(1, 2, 4, 8), gradient_accumulation_steps=(1, 4),
+                               max_lengths=(256, 512), memory_limit_gb=14, metric='tokens_per_second')
+    best = tuner.run()
+    print(f"Best configuration: {best and BatchSizeAutotuner.to_training_args(best)}")
@@ -1,11 +1,51 @@
 import time
 import os
-import pandas as pd
 import threading
-import psutil
-from pynvml import *
+from contextlib import contextmanager
 from typing import List, Dict
-import matplotlib.pyplot as plt
+
+# pandas, matplotlib, psutil and NVML are imported on first use so that importing
+# this module (e.g. to start a sampler inside a short-lived worker) stays cheap.
+_pd = None
+_plt = None
+_psutil = None
+
+
+def _pandas():
+    """Import pandas on first use."""
+    global _pd
+    if _pd is None:
+        import pandas
+        _pd = pandas
+    return _pd
+
+
+def _pyplot():
+    """Import matplotlib.pyplot on first use."""
+    global _plt
+    if _plt is None:
+        import matplotlib.pyplot
+        _plt = matplotlib.pyplot
+    return _plt
+
+
+def _psutil_module():
+    """Import psutil on first use."""
+    global _psutil
+    if _psutil is None:
+        import psutil
+        _psutil = psutil
+    return _psutil
+
+
+def _pynvml():
+    """Import pynvml on first use. Returns None if it is not installed."""
+    try:
+        import pynvml
+    except ImportError:
+        return None
+    return pynvml
+
 
 class ResourceMonitor:
     def __init__(self, interval=5, log_path=None, verbose=False):
@@ -24,12 +64,48 @@ class ResourceMonitor:
         self.event_log = []
         self.monitoring = False
         self.thread = None
+        self._nvml = None
+        self._gpu_handle = None
         
         self._log_event("SYSTEM", "ResourceMonitor initialized")
         # Load existing log if path is provided and file exists
         if self.log_path and os.path.exists(self.log_path):
             self.load_log(silent=True)
 
+    def _init_gpu(self):
+        """
+        Initialize NVML once for a monitoring session.
+        
+        Returns:
+            bool: True if a GPU handle is available for sampling.
+        """
+        nvml = _pynvml()
+        if nvml is None:
+            self._log_event("GPU", "pynvml not installed. GPU metrics will be reported as zero", is_error=True)
+            return False
+        try:
+            nvml.nvmlInit()
+            self._gpu_handle = nvml.nvmlDeviceGetHandleByIndex(0)
+            self._nvml = nvml
+            return True
+        except nvml.NVMLError as e:
+            self._log_event("GPU", f"NVML error: {str(e)}. Possibly no Nvidia GPUs present in the system", is_error=True)
+            try:
+                nvml.nvmlShutdown()
+            except Exception:
+                pass
+            return False
+
+    def _shutdown_gpu(self):
+        """Release the NVML session opened by `_init_gpu`."""
+        if self._nvml is not None:
+            try:
+                self._nvml.nvmlShutdown()
+            except Exception:
+                pass
+        self._nvml = None
+        self._gpu_handle = None
+
     def _log_gpu(self):
         """
         Log GPU usage using NVIDIA Management Library (NVML).
@@ -37,44 +113,95 @@ class ResourceMonitor:
         Returns:
             dict: GPU memory usage and utilization. Returns zeros if no GPU is available.
         """
+        # Outside of a monitoring session, open and close NVML for this single sample
+        owns_session = self._nvml is None
+        if owns_session and not self._init_gpu():
+            return {
+                'gpu_mem_GB': 0.0,
+                'gpu_util_percent': 0.0
+            }
+        nvml = self._nvml
         try:
-            nvmlInit()
-            handle = nvmlDeviceGetHandleByIndex(0)
-            mem_info = nvmlDeviceGetMemoryInfo(handle)
-            util_info = nvmlDeviceGetUtilizationRates(handle)
+            mem_info = nvml.nvmlDeviceGetMemoryInfo(self._gpu_handle)
+            util_info = nvml.nvmlDeviceGetUtilizationRates(self._gpu_handle)
             return {
                 'gpu_mem_GB': mem_info.used / (1024 ** 3),
                 'gpu_util_percent': util_info.gpu
             }
-        except NVMLError as e:
-            self._log_event("GPU", f"NVML error: {str(e)}. Possibly no Nvidia GPUs present in the system", is_error=True)
+        except nvml.NVMLError as e:
+            self._log_event("GPU", f"NVML error: {str(e)}", is_error=True)
             return {
                 'gpu_mem_GB': 0.0,
                 'gpu_util_percent': 0.0
             }
         finally:
-            try:
-                nvmlShutdown()
-            except:
-                pass
+            if owns_session:
+                self._shutdown_gpu()
 
-    def _log_resources(self):
+    def _sample(self, gpu_available=True):
         """
-        Log system resources (CPU, RAM, GPU) at regular intervals.
+        Take a single sample of system resources (CPU, RAM, GPU).
+        
+        Args:
+            gpu_available (bool): Whether to query NVML for GPU metrics
+            
+        Returns:
+            dict: Timestamped resource usage
         """
-        while self.monitoring:
-            memory = psutil.virtual_memory().used / (1024 ** 3)  # RAM in GB
-            cpu_percent = psutil.cpu_percent()
+        psutil = _psutil_module()
+        memory = psutil.virtual_memory().used / (1024 ** 3)  # RAM in GB
+        cpu_percent = psutil.cpu_percent()
+        if gpu_available:
             gpu_stats = self._log_gpu()
+        else:
+            gpu_stats = {'gpu_mem_GB': 0.0, 'gpu_util_percent': 0.0}
+        return {
+            'timestamp': time.time(),
+            'memory_GB': memory,
+            'cpu_percent': cpu_percent,
+            **gpu_stats
+        }
+
+    @contextmanager
+    def gpu_session(self):
+        """
+        Keep a single NVML session open across several `sample()` calls.
+
+        Yields:
+            bool: True if a GPU handle is available for sampling.
+        """
+        gpu_available = self._init_gpu()
+        try:
+            yield gpu_available
+        finally:
+            self._shutdown_gpu()
 
-            # Append resource usage to log
-            self.resource_log.append({
-                'timestamp': time.time(),
-                'memory_GB': memory,
-                'cpu_percent': cpu_percent,
-                **gpu_stats
-            })
-            time.sleep(self.interval)
+    def sample(self, gpu=True):
+        """
+        Take a single resource sample outside of the monitoring thread.
+
+        Outside of `gpu_session()`, NVML is opened and closed for this sample only.
+
+        Args:
+            gpu (bool): Whether to query NVML for GPU metrics
+
+        Returns:
+            dict: Timestamped resource usage, in the same format as `resource_log` entries
+        """
+        return self._sample(gpu_available=gpu)
+
+    def _log_resources(self):
+        """
+        Log system resources (CPU, RAM, GPU) at regular intervals.
+        """
+        gpu_available = self._init_gpu()
+        try:
+            while self.monitoring:
+                # Append resource usage to log
+                self.resource_log.append(self._sample(gpu_available))
+                time.sleep(self.interval)
+        finally:
+            self._shutdown_gpu()
 
     def _log_event(self, category, message, is_error=False):
         """Internal method to log system events"""
@@ -121,7 +248,7 @@ class ResourceMonitor:
                 raise ValueError("No load path specified")
 
             if os.path.exists(load_path):
-                df = pd.read_csv(load_path, parse_dates=['timestamp'])
+                df = _pandas().read_csv(load_path, parse_dates=['timestamp'])
                 self.resource_log = df.to_dict('records')
                 msg = f"Loaded {len(df)} entries from {load_path}"
                 self._log_event("IO", msg)
@@ -208,6 +335,7 @@ class ResourceMonitor:
         Returns:
             pd.DataFrame: Logged resource data.
         """
+        pd = _pandas()
         df = pd.DataFrame(self.resource_log)
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
         return df
@@ -222,6 +350,7 @@ class ResourceMonitor:
             print("No data to visualize.")
             return
 
+        plt = _pyplot()
         fig, ax = plt.subplots(3, 1, figsize=(12, 8))
         
         # Plot RAM usage
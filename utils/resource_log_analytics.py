@@ -0,0 +1,264 @@
+import glob
+import os
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+METRICS = ['memory_GB', 'cpu_percent', 'gpu_mem_GB', 'gpu_util_percent']
+
+
+class ResourceLogAnalytics:
+    """Compare resource logs saved by `ResourceMonitor.save_log` across many runs.
+
+    Runs are registered by path and only read when iterated, one at a time, so the memory
+    used is bounded by the largest single run rather than the whole collection. Every
+    statistic is computed with vectorized numpy operations on that run's arrays.
+    """
+
+    def __init__(self, runs=None, util_thresholds=(50, 90), idle_threshold=5.0, min_idle_seconds=60.0,
+                 percentiles=(5, 50, 95)):
+        """
+        Initialize the analytics.
+
+        Args:
+            runs (dict or list): Run name -> CSV path, or a list of CSV paths (named after the file)
+            util_thresholds (tuple): Utilization levels (%) for the time-above-threshold statistics
+            idle_threshold (float): GPU utilization (%) at or below which the run counts as idle
+                                    (CPU utilization is used for runs without GPU samples)
+            min_idle_seconds (float): Shortest idle stretch reported as an idle gap
+            percentiles (tuple): Percentiles reported for every metric
+        """
+        self.runs: Dict[str, str] = {}
+        self.steps: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.util_thresholds = util_thresholds
+        self.idle_threshold = idle_threshold
+        self.min_idle_seconds = min_idle_seconds
+        self.percentiles = percentiles
+
+        if isinstance(runs, dict):
+            for name, path in runs.items():
+                self.add_run(path, name)
+        else:
+            for path in runs or []:
+                self.add_run(path)
+
+    @classmethod
+    def from_glob(cls, pattern, **kwargs):
+        """Create analytics for every CSV matching a glob pattern, e.g. `training/**/*-resource-usage.csv`."""
+        return cls(sorted(glob.glob(pattern, recursive=True)), **kwargs)
+
+    def add_run(self, path, name=None):
+        """Register a run without reading it."""
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        if name in self.runs:
+            raise ValueError(f"Run {name} is already registered")
+        self.runs[name] = path
+
+    def add_steps(self, name, timestamps, steps):
+        """
+        Register when a run reached each training step, used to align runs on step.
+
+        Args:
+            name (str): Run name
+            timestamps: Wall-clock times (datetimes or epoch seconds) at which `steps` were logged
+            steps: Training step at each timestamp
+        """
+        self.steps[name] = (self._to_seconds(pd.Series(timestamps)), np.asarray(steps, dtype=np.float64))
+
+    @staticmethod
+    def _to_seconds(timestamps: pd.Series) -> np.ndarray:
+        """Convert datetime strings or epoch seconds to float epoch seconds."""
+        if pd.api.types.is_numeric_dtype(timestamps):
+            return timestamps.to_numpy(dtype=np.float64)
+        return pd.to_datetime(timestamps, format='ISO8601').to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+
+    def load_run(self, name) -> Dict[str, np.ndarray]:
+        """
+        Read a single run into arrays.
+
+        Returns:
+            dict: `timestamp` (epoch seconds), `relative_s`, `step` if known, and one float32 array per metric
+        """
+        path = self.runs[name]
+        header = pd.read_csv(path, nrows=0).columns
+        columns = ['timestamp'] + [c for c in METRICS + ['step'] if c in header]
+        df = pd.read_csv(path, usecols=columns, dtype={c: np.float32 for c in columns if c != 'timestamp'})
+
+        timestamps = self._to_seconds(df['timestamp'])
+        order = np.argsort(timestamps, kind='stable')
+        run = {'timestamp': timestamps[order], 'relative_s': timestamps[order] - timestamps[order][0]}
+        for column in columns[1:]:
+            run[column] = df[column].to_numpy()[order]
+        for metric in METRICS:
+            run.setdefault(metric, np.zeros(len(df), dtype=np.float32))
+
+        if 'step' not in run and name in self.steps:
+            step_times, steps = self.steps[name]
+            run['step'] = np.interp(run['timestamp'], step_times, steps).astype(np.float32)
+        return run
+
+    def _extent(self, name, axis_key) -> float:
+        """Largest relative time or step of a run, reading as few columns as possible."""
+        path = self.runs[name]
+        if axis_key == 'step' and 'step' in pd.read_csv(path, nrows=0).columns:
+            steps = pd.read_csv(path, usecols=['step'])['step']
+            return float(steps.max()) if len(steps) else 0.0
+        timestamps = self._to_seconds(pd.read_csv(path, usecols=['timestamp'])['timestamp'])
+        if not len(timestamps):
+            return 0.0
+        if axis_key == 'relative_s':
+            return float(timestamps.max() - timestamps.min())
+        if name not in self.steps:
+            return 0.0
+        step_times, steps = self.steps[name]
+        return float(np.interp(timestamps.max(), step_times, steps))
+
+    def iter_runs(self) -> Iterator[Tuple[str, Dict[str, np.ndarray]]]:
+        """Yield `(name, run)` pairs, reading one run at a time."""
+        for name in self.runs:
+            yield name, self.load_run(name)
+
+    @staticmethod
+    def _durations(timestamps: np.ndarray) -> np.ndarray:
+        """Time each sample represents: the gap to the next sample, the median gap for the last one."""
+        if len(timestamps) < 2:
+            return np.zeros(len(timestamps))
+        gaps = np.diff(timestamps)
+        return np.append(gaps, np.median(gaps))
+
+    @staticmethod
+    def _stretches(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and end (exclusive) indices of every run of True values in `mask`."""
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    def run_statistics(self, name, run) -> Dict:
+        """
+        Compute the statistics of a single run.
+
+        Returns:
+            dict: Duration, percentiles per metric, time above utilization thresholds, idle gaps,
+                  sampling gaps and memory growth slopes
+        """
+        timestamps = run['timestamp']
+        durations = self._durations(timestamps)
+        total_s = float(durations.sum())
+        stats = {'run': name, 'samples': len(timestamps), 'duration_h': total_s / 3600}
+        if not len(timestamps):
+            return stats
+
+        # Percentiles of every metric in a single call
+        values = np.stack([run[metric] for metric in METRICS])
+        for metric, row in zip(METRICS, np.percentile(values, self.percentiles, axis=1).T):
+            stats[f'{metric}_mean'] = float(run[metric].mean())
+            for q, value in zip(self.percentiles, row):
+                stats[f'{metric}_p{q}'] = float(value)
+
+        # Runs without an NVIDIA GPU log zeros, fall back to CPU utilization
+        has_gpu = bool(run['gpu_util_percent'].any())
+        utilization = run['gpu_util_percent'] if has_gpu else run['cpu_percent']
+        stats['utilization_source'] = 'gpu' if has_gpu else 'cpu'
+        for threshold in self.util_thresholds:
+            above = float(durations[utilization > threshold].sum())
+            stats[f'time_above_{threshold}_pct'] = above / total_s * 100 if total_s else 0.0
+
+        starts, ends = self._stretches(utilization <= self.idle_threshold)
+        # An idle stretch lasts from its first sample to the first busy sample after it (or the end of the run)
+        end_times = np.append(timestamps, timestamps[-1] + durations[-1])
+        idle = end_times[ends] - timestamps[starts]
+        idle = idle[idle >= self.min_idle_seconds]
+        stats['idle_gaps'] = int(len(idle))
+        stats['idle_pct'] = float(idle.sum()) / total_s * 100 if total_s else 0.0
+        stats['longest_idle_min'] = float(idle.max()) / 60 if len(idle) else 0.0
+
+        # Missing samples (e.g. the monitor thread stalled or the run was paused)
+        if len(timestamps) > 1:
+            gaps = np.diff(timestamps)
+            stats['sampling_gaps'] = int(np.count_nonzero(gaps > 3 * np.median(gaps)))
+        else:
+            stats['sampling_gaps'] = 0
+
+        # Linear trend of memory use over the run, in GB per hour
+        hours = run['relative_s'] / 3600
+        for metric in ('memory_GB', 'gpu_mem_GB'):
+            if len(hours) > 1 and hours[-1] > 0:
+                stats[f'{metric}_slope_per_h'] = float(np.polyfit(hours, run[metric].astype(np.float64), 1)[0])
+            else:
+                stats[f'{metric}_slope_per_h'] = 0.0
+        return stats
+
+    def compare(self, sort_by='gpu_util_percent_p50', ascending=False, baseline: Optional[str] = None) -> pd.DataFrame:
+        """
+        Build a ranked comparison table with one row per run.
+
+        Args:
+            sort_by (str): Statistic to rank the runs by
+            ascending (bool): Rank lowest first
+            baseline (str): Optional run name. Adds `<stat>_vs_baseline` columns with the relative
+                            change of the mean, percentile, time-above and idle statistics against it.
+
+        Returns:
+            pd.DataFrame: Statistics indexed by run name, with a `rank` column
+        """
+        table = pd.DataFrame([self.run_statistics(name, run) for name, run in self.iter_runs()]).set_index('run')
+        if table.empty:
+            return table
+
+        if baseline is not None:
+            if baseline not in table.index:
+                raise ValueError(f"Unknown baseline run: {baseline}")
+            suffixes = ('_mean',) + tuple(f'_p{q}' for q in self.percentiles)
+            columns = [c for c in table.columns if c.endswith(suffixes) or c.startswith('time_above_') or c == 'idle_pct']
+            reference = table.loc[baseline, columns].astype(float)
+            # Relative change, undefined where the baseline is zero
+            table[[f'{c}_vs_baseline' for c in columns]] = (
+                (table[columns].astype(float) - reference) / reference.replace(0, np.nan)).to_numpy()
+
+        table = table.sort_values(sort_by, ascending=ascending)
+        table.insert(0, 'rank', np.arange(1, len(table) + 1))
+        return table
+
+    def align(self, metric='gpu_util_percent', on='relative_time', points=500, grid=None) -> pd.DataFrame:
+        """
+        Resample a metric from every run onto a common axis.
+
+        Args:
+            metric (str): Metric to align
+            on (str): `relative_time` (seconds since each run started) or `step`
+            points (int): Number of grid points when `grid` is not given. The grid spans the longest run.
+            grid (array): Explicit axis values to resample onto
+
+        Returns:
+            pd.DataFrame: One column per run indexed by the axis. Values outside a run's range are NaN.
+        """
+        if on not in ('relative_time', 'step'):
+            raise ValueError("on must be 'relative_time' or 'step'.")
+        axis_key = 'relative_s' if on == 'relative_time' else 'step'
+
+        if grid is None:
+            # First pass reads only the timestamp column to find the extent
+            extent = 0.0
+            for name in self.runs:
+                extent = max(extent, self._extent(name, axis_key))
+            grid = np.linspace(0, extent, points)
+        grid = np.asarray(grid, dtype=np.float64)
+
+        aligned = {}
+        for name, run in self.iter_runs():
+            if axis_key not in run:
+                raise ValueError(f"Run {name} has no step information. Use add_steps() or a 'step' column.")
+            axis = run[axis_key].astype(np.float64)
+            aligned[name] = np.interp(grid, axis, run[metric], left=np.nan, right=np.nan) if len(axis) else np.nan
+        index_name = 'relative_s' if on == 'relative_time' else 'step'
+        return pd.DataFrame(aligned, index=pd.Index(grid, name=index_name))
+
+
+# Example Usage:
+if __name__ == "__main__":
+    repo_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    analytics = ResourceLogAnalytics.from_glob(os.path.join(repo_dir, 'training', '**', '*resource-usage.csv'))
+    columns = ['rank', 'duration_h', 'gpu_util_percent_p50', 'time_above_90_pct', 'idle_pct',
+               'longest_idle_min', 'memory_GB_slope_per_h', 'gpu_mem_GB_p95']
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(analytics.compare()[columns])